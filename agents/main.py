@@ -16,6 +16,7 @@ import uuid
 # Add project root to path for imports
 # sys.path.append(os.path.dirname(__file__))
 
+from src.api import dependencies
 from src.api.router import router
 from src.utils.logging_config import setup_logging
 
@@ -32,12 +33,13 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting Multi-Agent MARAG API...")
-    logger.info("Pipeline will be initialized per request")
+    await dependencies.startup(app)
     
     yield
     
     # Shutdown
     logger.info("Shutting down Multi-Agent MARAG API...")
+    await dependencies.shutdown(app)
 
 
 # Create FastAPI app
@@ -59,6 +61,48 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# Add request metrics middleware
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Count requests and errors and time them per route template. Timing stops
+    when the response body has been sent, so streamed responses
+    (/query/stream, /query/batch) count their full duration, not time to headers.
+    """
+    metrics = getattr(request.app.state, "metrics", None)
+    if metrics is None:
+        return await call_next(request)
+    start = time.perf_counter()
+    metrics.gauges["http_requests_in_flight"] += 1
+
+    def record(status_code: int) -> None:
+        metrics.gauges["http_requests_in_flight"] -= 1
+        # Route templates keep /jobs/{job_id} as one series
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.observe("http_request", time.perf_counter() - start, path)
+        metrics.increment("http_requests", path)
+        if status_code >= 500:
+            metrics.increment("http_errors", path)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        record(500)
+        raise
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            record(response.status_code)
+
+    response.body_iterator = timed_body()
+    return response
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,106 @@
+"""
+SupervisorGraphCache: App-scoped cache of the compiled supervisor graph.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import ensure_config
+from mcp.types import Tool as MCPTool
+
+from src.services.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+MCP_SESSION_CONFIG_KEY = "mcp_session"
+
+
+class ConfigBoundSession:
+    """
+    Stand-in for an MCP ClientSession inside cached LangChain tools.
+    The live session is resolved at call time from the LangGraph run config,
+    so one compiled graph can serve every request.
+    Listeners are called with (tool name, arguments) after each successful call.
+    """
+
+    def __init__(self, listeners: Optional[List[Callable[[str, Optional[Dict[str, Any]]], None]]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.listeners = listeners or []
+        self.metrics = metrics or MetricsRegistry()
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        session = ensure_config().get("configurable", {}).get(MCP_SESSION_CONFIG_KEY)
+        if session is None:
+            raise RuntimeError(f"No MCP session bound to the current run for tool '{name}'")
+        self.metrics.increment("mcp_tool_calls", name)
+        with self.metrics.timer("mcp_tool_call", name):
+            try:
+                result = await session.call_tool(name, arguments)
+            except Exception:
+                self.metrics.increment("mcp_tool_errors", name)
+                raise
+        if getattr(result, "isError", False):
+            self.metrics.increment("mcp_tool_errors", name)
+        else:
+            for listener in self.listeners:
+                listener(name, arguments)
+        return result
+
+
+class SupervisorGraph:
+    """Compiled supervisor graph plus everything built alongside it."""
+
+    def __init__(self, supervisor: Any, tools: List[Any], tracer: Any, key: Tuple[str, str]):
+        self.supervisor = supervisor
+        self.tools = tools
+        self.tracer = tracer
+        self.key = key
+
+
+def tool_schema_version(mcp_tools: List[MCPTool]) -> str:
+    """Stable fingerprint of the MCP tool list (names, descriptions and input schemas)."""
+    payload = sorted(
+        (tool.name, tool.description or "", json.dumps(tool.inputSchema, sort_keys=True))
+        for tool in mcp_tools
+    )
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
+
+
+class SupervisorGraphCache:
+    """
+    Builds the retriever, critique and supervisor graph once per
+    (LLM config, tool schema version) and reuses it across requests.
+    A new tool schema version replaces the previous entry.
+    """
+
+    def __init__(self):
+        self._graphs: Dict[Tuple[str, str], SupervisorGraph] = {}
+        self._lock = asyncio.Lock()
+        self.builds = 0
+
+    async def get(
+        self,
+        llm_key: str,
+        mcp_tools: List[MCPTool],
+        builder: Callable[[List[MCPTool], Tuple[str, str]], Awaitable[SupervisorGraph]],
+    ) -> SupervisorGraph:
+        key = (llm_key, tool_schema_version(mcp_tools))
+        graph = self._graphs.get(key)
+        if graph is not None:
+            return graph
+        async with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                logger.info(f"GraphCache: Building supervisor graph for tool schema {key[1]}")
+                graph = await builder(mcp_tools, key)
+                # Only the latest tool schema per LLM config is worth keeping
+                self._graphs = {k: v for k, v in self._graphs.items() if k[0] != llm_key}
+                self._graphs[key] = graph
+                self.builds += 1
+        return graph
+
+    def clear(self) -> None:
+        self._graphs.clear()
@@ -3,37 +3,106 @@ SupervisorPipeline: Multi-agent processing pipeline with supervisor coordination
 """
 
 import asyncio
+import json
 import time
 import logging
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from langchain_core.messages import AIMessageChunk
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.tools import load_mcp_tools
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
 from langgraph.prebuilt import create_react_agent
 from langgraph_supervisor import create_supervisor
 from opik.integrations.langchain import OpikTracer
 
-from src.services import LLMProvider
+from src.agents.graph_cache import (
+    MCP_SESSION_CONFIG_KEY,
+    ConfigBoundSession,
+    SupervisorGraph,
+    SupervisorGraphCache,
+)
+from src.services import AnswerCache, LLMProvider, MCPSessionPool, MetricsRegistry, SemanticCache
+from src.services.answer_cache import COLLECTION_VERSIONS_TOOL
 from src.utils.mcp_utils import get_mcp_server_config
 from src.api.models import QueryRequest, QueryResponse
 
 logger = logging.getLogger(__name__)
 
+# Node of the supervisor's react agent that calls the LLM; its tools node emits handoff messages
+SUPERVISOR_MODEL_NODE = "agent"
+SOURCES_MARKER = "Sources:"
+
+
+class _SourcesTailFilter:
+    """
+    Streams a message's text up to its "Sources:" section, which the final
+    result strips. Text that could be the start of the marker is held back
+    until the next chunk shows whether it is.
+    """
+
+    def __init__(self):
+        self._held = ""
+        self._done = False
+
+    def feed(self, text: str) -> str:
+        if self._done:
+            return ""
+        text = self._held + text
+        cut = text.find(SOURCES_MARKER)
+        if cut != -1:
+            self._held = ""
+            self._done = True
+            return text[:cut]
+        keep = next(
+            (n for n in range(len(SOURCES_MARKER) - 1, 0, -1) if text.endswith(SOURCES_MARKER[:n])), 0
+        )
+        self._held = text[len(text) - keep:] if keep else ""
+        return text[:len(text) - keep]
+
+    def flush(self) -> str:
+        held, self._held = self._held, ""
+        return "" if self._done else held
+
 
 class SupervisorPipeline:
     
-    def __init__(self, llm_provider: LLMProvider, ragas_validator=None, agent_output_processor=None):
+    def __init__(self, llm_provider: LLMProvider, ragas_validator=None, agent_output_processor=None,
+                 graph_cache: Optional[SupervisorGraphCache] = None,
+                 session_pool: Optional[MCPSessionPool] = None,
+                 answer_cache: Optional[AnswerCache] = None,
+                 semantic_cache: Optional[SemanticCache] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         self.llm_provider = llm_provider
+        self.metrics = metrics or MetricsRegistry()
+        self.session_pool = session_pool
+        self.answer_cache = answer_cache or AnswerCache()
+        self.semantic_cache = semantic_cache
         self.client = None
         self._initialized = False
         self.ragas_validator = ragas_validator
         self.agent_output_processor = agent_output_processor
+        self.graph_cache = graph_cache or SupervisorGraphCache()
     
     async def initialize(self):
         if self._initialized:
             return
-        self.client = MultiServerMCPClient(get_mcp_server_config())
+        if self.session_pool is not None:
+            await self.session_pool.start()
+        else:
+            self.client = MultiServerMCPClient(get_mcp_server_config())
         self._initialized = True
         logger.info("Pipeline: Started")
+
+    async def aclose(self):
+        if self.session_pool is not None:
+            await self.session_pool.aclose()
+        self.graph_cache.clear()
+        self.answer_cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+        self.client = None
+        self._initialized = False
+        logger.info("Pipeline: Closed")
     
     def _create_retriever_agent(self, tools: List[Any]) -> Any:
         logger.info("Agent: Retriever started")
@@ -104,6 +173,54 @@ class SupervisorPipeline:
         logger.info("Agent: Supervisor completed")
         return agent
     
+    def _llm_cache_key(self) -> str:
+        return self.llm_provider.config.model_dump_json()
+
+    async def _list_mcp_tools(self, session) -> List[Any]:
+        tools = []
+        cursor = None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            tools.extend(page.tools or [])
+            cursor = page.nextCursor
+            if not cursor:
+                return tools
+
+    async def _build_graph(self, mcp_tools: List[Any], key) -> SupervisorGraph:
+        listeners = [self.answer_cache.on_tool_call]
+        if self.semantic_cache is not None:
+            listeners.append(self.semantic_cache.on_tool_call)
+        session = ConfigBoundSession(listeners=listeners, metrics=self.metrics)
+        with self.metrics.timer("graph_build"):
+            tools = [convert_mcp_tool_to_langchain_tool(session, tool) for tool in mcp_tools]
+            retriever_agent = self._create_retriever_agent(tools)
+            critique_agent = self._create_critique_agent()
+            supervisor = self._create_supervisor_agent([retriever_agent, critique_agent])
+            opik_tracer = OpikTracer(
+                graph=supervisor.get_graph(xray=True),
+                tags=["multi-agent", "marag"],
+                metadata={"environment": "development", "version": "1.0"}
+            )
+        return SupervisorGraph(supervisor=supervisor, tools=tools, tracer=opik_tracer, key=key)
+
+    @asynccontextmanager
+    async def _borrow_session(self) -> AsyncIterator[Tuple[Any, List[Any]]]:
+        """Yield an MCP session and the server's tool list, pooled when a pool is configured."""
+        start = time.perf_counter()
+        if self.session_pool is not None:
+            async with self.session_pool.acquire() as session:
+                self.metrics.observe("mcp_session_open", time.perf_counter() - start)
+                yield session, self.session_pool.tools
+        else:
+            async with self.client.session("chroma") as session:
+                self.metrics.observe("mcp_session_open", time.perf_counter() - start)
+                with self.metrics.timer("mcp_tool_load"):
+                    mcp_tools = await self._list_mcp_tools(session)
+                yield session, mcp_tools
+
+    async def _get_graph(self, mcp_tools: List[Any]) -> SupervisorGraph:
+        return await self.graph_cache.get(self._llm_cache_key(), mcp_tools, self._build_graph)
+
     def _format_query(self, request: QueryRequest) -> str:
         query_text=f"{request.query_text}. Fetch results k={request.k}. from collection name={request.collection_name}. Format the results in human readable form and generate output in separate rows."
         logger.info(f"Formatted query: {query_text}")
@@ -128,24 +245,173 @@ class SupervisorPipeline:
         
         return sources
     
-    async def process_query(self, request: QueryRequest) -> QueryResponse:
+    async def _validate(self, request: QueryRequest, final_message_history: List[Any],
+                        final_answer: str) -> Optional[Dict[str, Any]]:
+        if not (request.enable_validation and self.ragas_validator and self.agent_output_processor):
+            return None
+        logger.info("Validation: RAGAS started")
+        try:
+            agent_outputs = {
+                "messages": final_message_history,
+                "supervisor_result": final_answer
+            }
+            ragas_input = self.agent_output_processor.prepare_ragas_input(
+                query=request.query_text,
+                agent_outputs=agent_outputs
+            )
+            with self.metrics.timer("ragas_validation"):
+                validation = await self.ragas_validator.validate_response(ragas_input)
+            logger.info("Validation: RAGAS completed")
+            return {
+                "passed": validation.passed,
+                "overall_score": validation.overall_score,
+                "metrics": validation.metrics
+            }
+        except Exception as e:
+            self.metrics.increment("ragas_validation_errors")
+            logger.error(f"RAGAS validation failed: {e}")
+            return {
+                "passed": False,
+                "error": str(e)
+            }
+
+    def _error_response(self, error: Exception, start_time: float) -> QueryResponse:
+        execution_time = time.time() - start_time
+        logger.error(f"Pipeline execution failed: {error}", exc_info=error)
+        return QueryResponse(
+            status="error",
+            result=f"Pipeline execution failed: {str(error)}",
+            metadata={
+                "execution_time_seconds": round(execution_time, 2),
+                "error_type": type(error).__name__
+            }
+        )
+
+    def _exact_cache_hit(self, request: QueryRequest) -> Optional[QueryResponse]:
+        cached = self.answer_cache.get(
+            request.query_text, request.collection_name, request.k, request.enable_validation
+        )
+        if cached is None:
+            return None
+        logger.info("Pipeline: Answer cache hit")
+        response = cached.model_copy(deep=True)
+        response.metadata["cache_hit"] = True
+        self.metrics.increment("cache_hits", "exact")
+        return response
+
+    async def _sync_collection_version(self, session: Any, collection_name: str) -> bool:
+        """
+        Bring the caches' collection version in line with the MCP server's, so
+        writes from other clients or the loader invalidate cached answers.
+        Returns False, and the caches are bypassed, if the version is unknown.
+        """
+        semantic_enabled = self.semantic_cache is not None and self.semantic_cache.config.enabled
+        if not (self.answer_cache.config.enabled or semantic_enabled):
+            return False
+        try:
+            with self.metrics.timer("cache_version_check"):
+                result = await session.call_tool(COLLECTION_VERSIONS_TOOL, {"collection_names": [collection_name]})
+            text = result.content[0].text if result.content else ""
+            if result.isError:
+                raise RuntimeError(text)
+            token = json.loads(text)[collection_name]
+        except Exception as e:
+            logger.warning(f"Pipeline: Answer caches skipped, collection version unavailable: {e}")
+            return False
+        if self.answer_cache.sync_version(collection_name, token) and self.semantic_cache is not None:
+            self.semantic_cache.invalidate(collection_name)
+        return True
+
+    async def _semantic_cache_hit(self, request: QueryRequest, version: int) -> Tuple[Optional[QueryResponse], Any]:
+        """Look up a paraphrase of the query; also returns the query vector for a later put."""
+        if self.semantic_cache is None or not self.semantic_cache.config.enabled:
+            return None, None
+        try:
+            query_vector = await self.semantic_cache.embed(request.query_text)
+        except Exception as e:
+            logger.warning(f"Pipeline: Semantic cache skipped, query embedding failed: {e}")
+            return None, None
+        match = self.semantic_cache.lookup(
+            query_vector, request.collection_name, request.k, request.enable_validation, version
+        )
+        if match is None:
+            return None, query_vector
+        cached, similarity = match
+        logger.info(f"Pipeline: Semantic cache hit (similarity {similarity:.3f})")
+        response = cached.model_copy(deep=True)
+        response.metadata["cache_hit"] = True
+        response.metadata["cache_similarity"] = round(similarity, 4)
+        self.metrics.increment("cache_hits", "semantic")
+        return response, query_vector
+
+    def _store_response(self, request: QueryRequest, response: QueryResponse, version: int,
+                        query_vector: Any) -> None:
+        self.answer_cache.put(
+            request.query_text, request.collection_name, request.k, response,
+            request.enable_validation, version=version
+        )
+        if query_vector is not None and version == self.answer_cache.version(request.collection_name):
+            self.semantic_cache.put(
+                query_vector, request.collection_name, request.k, request.enable_validation,
+                version, response
+            )
+
+    def get_performance_metrics(self) -> Dict[str, Any]:
+        return {
+            "initialized": self._initialized,
+            "answer_cache": self.answer_cache.stats(),
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache is not None else None,
+            "graph_cache": {"builds": self.graph_cache.builds},
+            "mcp_pool": self.session_pool.stats() if self.session_pool is not None else None,
+            "queries": {
+                "total": self.metrics.counter("queries"),
+                "errors": self.metrics.counter("query_errors"),
+                "in_flight": self.metrics.gauges["queries_in_flight"],
+            },
+            "latency": self.metrics.snapshot(),
+        }
+
+    async def astream_query(self, request: QueryRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the supervisor graph and yield events while it runs:
+        - agent_step: a top-level agent (supervisor, retriever, critique) finished a hop
+        - token: a chunk of the supervisor's answer as the LLM generates it, without
+          the "Sources:" section the final result also strips (whitespace may differ)
+        - final: the complete QueryResponse, always the last event
+        """
+        self.metrics.increment("queries")
+        with self.metrics.in_flight("queries_in_flight"), self.metrics.timer("query"):
+            async for event in self._astream_query(request):
+                if event["event"] == "final" and event["data"].status != "success":
+                    self.metrics.increment("query_errors")
+                yield event
+
+    async def _astream_query(self, request: QueryRequest) -> AsyncIterator[Dict[str, Any]]:
         start_time = time.time()
         try:
             await self.initialize()
-            async with self.client.session("chroma") as session:
-                tools = await load_mcp_tools(session)
-                retriever_agent = self._create_retriever_agent(tools)
-                critique_agent = self._create_critique_agent()
-                supervisor = self._create_supervisor_agent([retriever_agent, critique_agent])
-                formatted_query = self._format_query(request)
-                opik_tracer = OpikTracer(
-                    graph=supervisor.get_graph(xray=True),
-                    tags=["multi-agent", "marag"],
-                    metadata={"environment": "development", "version": "1.0"}
+            async with self._borrow_session() as (session, mcp_tools):
+                caches_current = await self._sync_collection_version(session, request.collection_name)
+                cached = self._exact_cache_hit(request) if caches_current else None
+                if cached is not None:
+                    yield {"event": "final", "data": cached}
+                    return
+                # Read before the run so an answer raced by a write is never cached
+                version = self.answer_cache.version(request.collection_name)
+                cached, query_vector = (
+                    await self._semantic_cache_hit(request, version) if caches_current else (None, None)
                 )
+                if cached is not None:
+                    yield {"event": "final", "data": cached}
+                    return
+                graph = await self._get_graph(mcp_tools)
+                tools = graph.tools
+                formatted_query = self._format_query(request)
                 chunk = None
-                messages = []
-                async for chunk in supervisor.astream(
+                total_chunks = 0
+                stream_message_id, sources_filter = None, _SourcesTailFilter()
+                hop_start = time.perf_counter()
+                async for namespace, mode, data in graph.supervisor.astream(
                     {
                         "messages": [
                             {
@@ -154,11 +420,51 @@ class SupervisorPipeline:
                             }
                         ]
                     },
-                    config={"callbacks": [opik_tracer]}
+                    config={
+                        "callbacks": [graph.tracer],
+                        "configurable": {MCP_SESSION_CONFIG_KEY: session},
+                    },
+                    stream_mode=["updates", "messages"],
+                    subgraphs=True
                 ):
-                    if chunk:
-                        messages.append(chunk)
-                if chunk is not None:
+                    if mode == "updates":
+                        # Only top-level updates are agent hops; nested ones are their inner steps
+                        if namespace or not data:
+                            continue
+                        chunk = data
+                        total_chunks += 1
+                        hop_end = time.perf_counter()
+                        for agent_name in data:
+                            self.metrics.observe("agent_hop", hop_end - hop_start, agent_name)
+                            yield {
+                                "event": "agent_step",
+                                "data": {
+                                    "agent": agent_name,
+                                    "step": total_chunks,
+                                    "elapsed_seconds": round(time.time() - start_time, 2)
+                                }
+                            }
+                        hop_start = time.perf_counter()
+                    elif namespace and namespace[0].split(":")[0] == "supervisor":
+                        message_chunk, message_metadata = data
+                        if (not isinstance(message_chunk, AIMessageChunk)
+                                or message_metadata.get("langgraph_node") != SUPERVISOR_MODEL_NODE
+                                or not isinstance(message_chunk.content, str)):
+                            continue
+                        if message_chunk.id != stream_message_id:
+                            text = sources_filter.flush()
+                            if text:
+                                yield {"event": "token", "data": {"text": text}}
+                            stream_message_id, sources_filter = message_chunk.id, _SourcesTailFilter()
+                        text = sources_filter.feed(message_chunk.content)
+                        if text:
+                            yield {"event": "token", "data": {"text": text}}
+                text = sources_filter.flush()
+                if text:
+                    yield {"event": "token", "data": {"text": text}}
+
+                final_message_history = []
+                if chunk is not None and "supervisor" in chunk:
                     final_message_history = chunk["supervisor"]["messages"]
                     final_answer = final_message_history[-1].content if final_message_history else "No answer generated"
                 else:
@@ -173,60 +479,37 @@ class SupervisorPipeline:
                     "execution_time_seconds": round(execution_time, 2),
                     "collection_name": request.collection_name,
                     "k_results": request.k,
-                    "total_chunks": len(messages),
+                    "total_chunks": total_chunks,
                     "tools_available": len(tools),
                     "sources": source_metadata
                 }
-                validation_result = None
-                if request.enable_validation and self.ragas_validator and self.agent_output_processor:
-                    logger.info("Validation: RAGAS started")
-                    try:
-                        agent_outputs = {
-                            "messages": final_message_history,
-                            "supervisor_result": final_answer
-                        }
-                        ragas_input = self.agent_output_processor.prepare_ragas_input(
-                            query=request.query_text,
-                            agent_outputs=agent_outputs
-                        )
-                        validation = await self.ragas_validator.validate_response(ragas_input)
-                        logger.info("Validation: RAGAS completed")
-                        validation_result = {
-                            "passed": validation.passed,
-                            "overall_score": validation.overall_score,
-                            "metrics": validation.metrics
-                        }
-                    except Exception as e:
-                        logger.error(f"RAGAS validation failed: {e}")
-                        validation_result = {
-                            "passed": False,
-                            "error": str(e)
-                        }
+                validation_result = await self._validate(request, final_message_history, final_answer)
                 logger.info("Pipeline: Completed")
                 
                 # Clean sources from final answer before returning to user
-                if "Sources:" in final_answer:
-                    clean_final_answer = final_answer.split("Sources:")[0].strip()
+                if SOURCES_MARKER in final_answer:
+                    clean_final_answer = final_answer.split(SOURCES_MARKER)[0].strip()
                 else:
                     clean_final_answer = final_answer
 
-                return QueryResponse(
+                response = QueryResponse(
                     status="success",
                     result=clean_final_answer,  # Clean response without sources
                     metadata=metadata,
                     validation=validation_result
                 )
+                if caches_current:
+                    self._store_response(request, response, version, query_vector)
         except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"Pipeline execution failed: {e}", exc_info=True)
-            return QueryResponse(
-                status="error",
-                result=f"Pipeline execution failed: {str(e)}",
-                metadata={
-                    "execution_time_seconds": round(execution_time, 2),
-                    "error_type": type(e).__name__
-                }
-            )
+            response = self._error_response(e, start_time)
+        yield {"event": "final", "data": response}
+
+    async def process_query(self, request: QueryRequest) -> QueryResponse:
+        response = None
+        async for event in self.astream_query(request):
+            if event["event"] == "final":
+                response = event["data"]
+        return response
 
 
 # Global pipeline instance
@@ -1,14 +1,27 @@
 """
 FastAPI dependencies for multi-agent MARAG system.
 Centralized dependency creation and management.
+
+Shared objects are created once by `startup()` from the app lifespan, stored
+on `app.state` and injected into requests from there.
 """
 
+import asyncio
 import logging
-from fastapi import Depends
+from fastapi import Depends, FastAPI, Request
+from langchain_huggingface import HuggingFaceEmbeddings
+from src.agents.graph_cache import SupervisorGraphCache
 from src.agents.pipeline import SupervisorPipeline
-from src.validation.ragas_validator import RAGASValidator
+from src.validation.ragas_validator import EMBEDDING_MODEL_NAME, RAGASValidator
 from src.validation.agent_output_processor import AgentOutputProcessor
-from src.services import LLMProvider, LLMProviderConfig
+from src.api.models import QueryRequest
+from src.services import (
+    AnswerCache, EventLoopLagMonitor, JobManager, LLMProvider, LLMProviderConfig, MCPSessionPool, MetricsRegistry, SemanticCache,
+    create_job_store
+)
+from src.utils.cache_utils import get_answer_cache_config, get_semantic_cache_config
+from src.utils.job_utils import get_batch_config, get_job_config
+from src.utils.mcp_utils import get_mcp_server_config, get_mcp_pool_config
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +29,96 @@ logger = logging.getLogger(__name__)
 def get_llm_config() -> LLMProviderConfig:
     return LLMProviderConfig()
 
-async def get_llm_provider(
-    config: LLMProviderConfig = Depends(get_llm_config)
-) -> LLMProvider:
+
+async def startup(app: FastAPI) -> None:
+    """Create the app-scoped singletons and warm up the pipeline."""
+    metrics = MetricsRegistry()
+    llm_provider = LLMProvider(get_llm_config())
+    semantic_cache = None
+    embeddings = None
+    semantic_cache_config = get_semantic_cache_config()
+    if semantic_cache_config.enabled:
+        try:
+            # Loading the model blocks for a few seconds, so keep it off the event loop
+            embeddings = await asyncio.to_thread(
+                HuggingFaceEmbeddings, model_name=semantic_cache_config.embedding_model_name
+            )
+            semantic_cache = SemanticCache(embeddings, semantic_cache_config)
+        except Exception as e:
+            logger.error(f"Semantic cache disabled, embedding model failed to load: {e}")
+    if semantic_cache_config.embedding_model_name != EMBEDDING_MODEL_NAME:
+        embeddings = None
+    ragas_validator = RAGASValidator(llm_provider=llm_provider, embeddings=embeddings)
+    agent_output_processor = AgentOutputProcessor()
+    session_pool = MCPSessionPool(get_mcp_server_config(), config=get_mcp_pool_config(), metrics=metrics)
+    pipeline = SupervisorPipeline(
+        llm_provider=llm_provider,
+        ragas_validator=ragas_validator,
+        agent_output_processor=agent_output_processor,
+        graph_cache=SupervisorGraphCache(),
+        session_pool=session_pool,
+        answer_cache=AnswerCache(get_answer_cache_config()),
+        semantic_cache=semantic_cache,
+        metrics=metrics
+    )
+
+    app.state.metrics = metrics
+    app.state.loop_monitor = EventLoopLagMonitor(metrics)
+    app.state.llm_provider = llm_provider
+    app.state.ragas_validator = ragas_validator
+    app.state.agent_output_processor = agent_output_processor
+    app.state.mcp_pool = session_pool
+    app.state.pipeline = pipeline
+
+    async def run_query_job(payload):
+        response = await pipeline.process_query(QueryRequest(**payload))
+        if response.status != "success":
+            raise RuntimeError(response.result)
+        return response.model_dump(mode="json")
+
+    job_config = get_job_config()
+    job_manager = JobManager(run_query_job, create_job_store(job_config), job_config)
+    app.state.job_manager = job_manager
+    # Shared by every batch request so total batch load is bounded, not per connection
+    app.state.batch_semaphore = asyncio.Semaphore(get_batch_config().max_concurrency)
+    logger.info("Dependencies: Created app-scoped singletons")
+
     try:
-        provider = LLMProvider(config)
-        logger.info("Dependencies: Injected LLMProvider")
-        return provider
+        await pipeline.initialize()
     except Exception as e:
-        logger.error(f"LLMProvider creation failed: {e}")
-        raise
+        # Keep serving; the pipeline retries initialize() on the next request
+        logger.error(f"SupervisorPipeline initialization failed: {e}")
+    await job_manager.start()
+    app.state.loop_monitor.start()
+
+
+async def shutdown(app: FastAPI) -> None:
+    """Release everything created by `startup()`."""
+    loop_monitor: EventLoopLagMonitor = getattr(app.state, "loop_monitor", None)
+    if loop_monitor is not None:
+        await loop_monitor.aclose()
+    job_manager: JobManager = getattr(app.state, "job_manager", None)
+    if job_manager is not None:
+        await job_manager.aclose()
+    pipeline: SupervisorPipeline = getattr(app.state, "pipeline", None)
+    if pipeline is not None:
+        await pipeline.aclose()
+    llm_provider: LLMProvider = getattr(app.state, "llm_provider", None)
+    if llm_provider is not None:
+        await llm_provider.aclose()
+    logger.info("Dependencies: Released app-scoped singletons")
+
+
+def get_metrics_registry(request: Request) -> MetricsRegistry:
+    return request.app.state.metrics
+
+
+def get_loop_monitor(request: Request) -> EventLoopLagMonitor:
+    return request.app.state.loop_monitor
+
+
+def get_llm_provider(request: Request) -> LLMProvider:
+    return request.app.state.llm_provider
 
 
 async def get_gemini_llm(llm_provider: LLMProvider = Depends(get_llm_provider)):
@@ -48,42 +141,25 @@ async def get_openai_llm(llm_provider: LLMProvider = Depends(get_llm_provider)):
         raise
 
 
-async def get_ragas_validator(
-    llm_provider: LLMProvider = Depends(get_llm_provider)
-) -> RAGASValidator:
-    try:
-        validator = RAGASValidator(llm_provider=llm_provider)
-        logger.info("Dependencies: Injected RAGASValidator")
-        return validator
-    except Exception as e:
-        logger.error(f"RAGASValidator creation failed: {e}")
-        raise
+def get_ragas_validator(request: Request) -> RAGASValidator:
+    return request.app.state.ragas_validator
 
 
-async def get_agent_output_processor() -> AgentOutputProcessor:
-    try:
-        processor = AgentOutputProcessor()
-        logger.info("Dependencies: Injected AgentOutputProcessor")
-        return processor
-    except Exception as e:
-        logger.error(f"AgentOutputProcessor creation failed: {e}")
-        raise
+def get_agent_output_processor(request: Request) -> AgentOutputProcessor:
+    return request.app.state.agent_output_processor
 
 
-async def get_supervisor_pipeline(
-    llm_provider: LLMProvider = Depends(get_llm_provider),
-    ragas_validator: RAGASValidator = Depends(get_ragas_validator),
-    agent_output_processor: AgentOutputProcessor = Depends(get_agent_output_processor)
-) -> SupervisorPipeline:
-    try:
-        pipeline = SupervisorPipeline(
-            llm_provider=llm_provider,
-            ragas_validator=ragas_validator,
-            agent_output_processor=agent_output_processor
-        )
-        logger.info("Dependencies: Injected SupervisorPipeline")
-        await pipeline.initialize()
-        return pipeline
-    except Exception as e:
-        logger.error(f"SupervisorPipeline creation failed: {e}")
-        raise
+def get_mcp_session_pool(request: Request) -> MCPSessionPool:
+    return request.app.state.mcp_pool
+
+
+def get_supervisor_pipeline(request: Request) -> SupervisorPipeline:
+    return request.app.state.pipeline
+
+
+def get_batch_semaphore(request: Request) -> asyncio.Semaphore:
+    return request.app.state.batch_semaphore
+
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.job_manager
@@ -1,7 +1,7 @@
 
 
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 import logging
 
@@ -67,6 +67,53 @@ class QueryResponse(BaseModel):
         }
 
 
+class BatchQueryRequest(BaseModel):
+
+    queries: List[QueryRequest] = Field(..., min_length=1, max_length=1000, description="Queries to process")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"query_text": "how to export spectrum dataflow?", "collection_name": "docs", "k": 2},
+                    {"query_text": "does spectrum support s3?", "collection_name": "docs", "k": 2}
+                ]
+            }
+        }
+
+
+class BatchQueryResult(BaseModel):
+
+    index: int = Field(..., description="Position of the query in the submitted batch")
+    response: QueryResponse = Field(..., description="Response for that query")
+
+
+class JobResponse(BaseModel):
+
+    job_id: str = Field(..., description="Identifier to poll or cancel the job with")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    result: Optional[QueryResponse] = Field(None, description="Query response once the job has succeeded")
+    error: Optional[str] = Field(None, description="Failure reason if the job failed")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = Field(None, description="When a finished job's result is discarded")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2c9a7e5b8d4e1f9a6c0b2d4e6f8a1c",
+                "status": "running",
+                "result": None,
+                "error": None,
+                "created_at": "2025-07-07T10:30:00Z",
+                "started_at": "2025-07-07T10:30:01Z",
+                "finished_at": None,
+                "expires_at": None
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
 
     status: str = "error"
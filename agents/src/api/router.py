@@ -1,14 +1,22 @@
 
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import json
 import logging
 import time
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 
-from src.api.models import QueryRequest, QueryResponse, ErrorResponse
+from src.api.models import (
+    QueryRequest, QueryResponse, ErrorResponse, BatchQueryRequest, BatchQueryResult, JobResponse
+)
 from src.agents.pipeline import SupervisorPipeline
-from src.api.dependencies import get_supervisor_pipeline
+from src.api.dependencies import (
+    get_supervisor_pipeline, get_batch_semaphore, get_job_manager, get_metrics_registry, get_loop_monitor
+)
+from src.services import EventLoopLagMonitor, Job, JobManager, JobStoreFullError, MetricsRegistry
+from src.services.prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE, render_prometheus
 
 # logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -54,6 +62,130 @@ async def process_query(
         )
 
 
+def _format_sse(event: str, data: Any) -> str:
+    if hasattr(data, "model_dump"):
+        data = data.model_dump(mode="json")
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post(
+    "/query/stream",
+    summary="Stream Query with Multi-Agent System",
+    description="Submit a query and receive agent steps, answer tokens and the final response as Server-Sent Events",
+    response_class=StreamingResponse
+)
+async def stream_query(
+    request: QueryRequest,
+    pipeline: SupervisorPipeline = Depends(get_supervisor_pipeline)
+) -> StreamingResponse:
+
+    request_id = str(uuid.uuid4())[:8]
+
+    async def event_stream() -> AsyncIterator[str]:
+        start_time = time.time()
+        logger.info(f"[{request_id}] Starting streamed query processing")
+        async for event in pipeline.astream_query(request):
+            if event["event"] == "final":
+                execution_time = time.time() - start_time
+                logger.info(f"[{request_id}] Streamed query finished with status "
+                            f"{event['data'].status} in {execution_time:.2f}s")
+            yield _format_sse(event["event"], event["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post(
+    "/query/batch",
+    summary="Process a Batch of Queries",
+    description="Run many queries through the shared pipeline under a bounded concurrency limit; "
+                "results are streamed as NDJSON lines in completion order",
+    response_class=StreamingResponse
+)
+async def batch_query(
+    batch: BatchQueryRequest,
+    pipeline: SupervisorPipeline = Depends(get_supervisor_pipeline),
+    semaphore: asyncio.Semaphore = Depends(get_batch_semaphore)
+) -> StreamingResponse:
+
+    batch_id = str(uuid.uuid4())[:8]
+
+    async def run_one(index: int, request: QueryRequest) -> BatchQueryResult:
+        async with semaphore:
+            return BatchQueryResult(index=index, response=await pipeline.process_query(request))
+
+    async def result_stream() -> AsyncIterator[str]:
+        start_time = time.time()
+        logger.info(f"[{batch_id}] Starting batch of {len(batch.queries)} queries")
+        tasks = [asyncio.create_task(run_one(i, q)) for i, q in enumerate(batch.queries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield result.model_dump_json() + "\n"
+        finally:
+            # Client went away or we failed: don't leave queries running for nobody
+            for task in tasks:
+                task.cancel()
+        logger.info(f"[{batch_id}] Batch completed in {time.time() - start_time:.2f}s")
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(**job.model_dump(mode="json", exclude={"request"}))
+
+
+@router.post(
+    "/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    summary="Submit Query Job",
+    description="Queue a query for background processing and return a job id to poll"
+)
+async def submit_job(
+    request: QueryRequest,
+    response: Response,
+    job_manager: JobManager = Depends(get_job_manager)
+) -> JobResponse:
+    try:
+        job = await job_manager.submit(request.model_dump())
+    except JobStoreFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    logger.info(f"[{job.job_id[:8]}] Job queued")
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.job_id}"
+    return _job_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    summary="Get Query Job",
+    description="Poll a job's status; the query response is included once it has succeeded"
+)
+async def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> JobResponse:
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return _job_response(job)
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    summary="Cancel Query Job",
+    description="Cancel a queued or running job, or discard a finished job's result"
+)
+async def cancel_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> JobResponse:
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    logger.info(f"[{job_id[:8]}] Job {job.status.value}")
+    return _job_response(job)
+
+
 @router.get(
     "/health",
     summary="Health Check",
@@ -108,7 +240,14 @@ async def api_info() -> Dict[str, Any]:
         "description": "RESTful API for document retrieval and analysis using multi-agent system",
         "endpoints": {
             "POST /api/v1/query": "Process query with multi-agent system",
+            "POST /api/v1/query/stream": "Process query and stream progress as Server-Sent Events",
+            "POST /api/v1/query/batch": "Process a list of queries, streaming NDJSON results",
+            "POST /api/v1/jobs": "Queue a query as a background job",
+            "GET /api/v1/jobs/{job_id}": "Poll a job's status and result",
+            "DELETE /api/v1/jobs/{job_id}": "Cancel a job or discard its result",
             "GET /api/v1/health": "Health check endpoint",
+            "GET /api/v1/metrics": "Operational metrics as JSON",
+            "GET /api/v1/metrics/prometheus": "Operational metrics in Prometheus text format",
             "GET /api/v1/": "API information"
         },
         "agents": [
@@ -124,7 +263,8 @@ async def api_info() -> Dict[str, Any]:
     description="Get performance and operational metrics for monitoring"
 )
 async def get_metrics(
-    pipeline: SupervisorPipeline = Depends(get_supervisor_pipeline)
+    pipeline: SupervisorPipeline = Depends(get_supervisor_pipeline),
+    registry: MetricsRegistry = Depends(get_metrics_registry)
 ) -> Dict[str, Any]:
 
     metrics_id = str(uuid.uuid4())[:8]
@@ -134,6 +274,7 @@ async def get_metrics(
         logger.debug(f"[{metrics_id}] Collecting metrics")
         
         pipeline_metrics = pipeline.get_performance_metrics()
+        total_requests = registry.counter("http_requests")
         
         execution_time = time.time() - start_time
         
@@ -144,9 +285,9 @@ async def get_metrics(
             "metrics_collection_time_ms": round(execution_time * 1000, 2),
             "pipeline": pipeline_metrics,
             "endpoints": {
-                "total_requests": "N/A",  
-                "active_requests": "N/A",
-                "error_rate": "N/A"
+                "total_requests": total_requests,
+                "active_requests": registry.gauges["http_requests_in_flight"],
+                "error_rate": round(registry.counter("http_errors") / total_requests, 4) if total_requests else 0.0
             }
         }
         
@@ -164,3 +305,34 @@ async def get_metrics(
             "error": str(e),
             "collection_time_ms": round(execution_time * 1000, 2)
         }
+
+
+@router.get(
+    "/metrics/prometheus",
+    summary="Prometheus Metrics",
+    description="Latency histograms, counters, cache, pool and event-loop gauges in Prometheus text format",
+    response_class=PlainTextResponse
+)
+async def get_prometheus_metrics(
+    pipeline: SupervisorPipeline = Depends(get_supervisor_pipeline),
+    registry: MetricsRegistry = Depends(get_metrics_registry),
+    loop_monitor: EventLoopLagMonitor = Depends(get_loop_monitor),
+    job_manager: JobManager = Depends(get_job_manager)
+) -> PlainTextResponse:
+    gauges = {"event_loop_lag_last_seconds": loop_monitor.last_lag_seconds}
+    for cache_name in ("answer_cache", "semantic_cache"):
+        cache = getattr(pipeline, cache_name)
+        if cache is not None:
+            stats = cache.stats()
+            gauges[f"{cache_name}_entries"] = stats["entries"]
+            gauges[f"{cache_name}_hit_ratio"] = stats["hit_ratio"]
+    if pipeline.session_pool is not None:
+        pool = pipeline.session_pool.stats()
+        gauges["mcp_pool_sessions"] = pool["size"]
+        gauges["mcp_pool_healthy_sessions"] = pool["healthy"]
+        gauges["mcp_pool_in_flight"] = pool["in_flight"]
+        gauges["mcp_pool_utilization"] = round(pool["in_flight"] / pool["capacity"], 4) if pool["capacity"] else 0.0
+    jobs = await job_manager.stats()
+    gauges["jobs_queued"] = jobs["queued"]
+    gauges["jobs_running"] = jobs["running"]
+    return PlainTextResponse(render_prometheus(registry, gauges), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,4 +1,19 @@
+from .answer_cache import AnswerCache
+from .job_manager import JobManager
+from .job_store import JobStore, JobStoreFullError, create_job_store
 from .llm_provider import LLMProvider
+from .mcp_session_pool import MCPSessionPool
+from .metrics import EventLoopLagMonitor, Histogram, MetricsRegistry
+from .semantic_cache import SemanticCache
 from .schemas.llm_schemas import LLMProviderConfig, LLMConfig, LLMProviderEnum
+from .schemas.mcp_schemas import MCPSessionPoolConfig
+from .schemas.cache_schemas import AnswerCacheConfig, SemanticCacheConfig
+from .schemas.job_schemas import BatchQueryConfig, Job, JobManagerConfig, JobStatus
 
-__all__ = ["LLMProvider", "LLMProviderConfig", "LLMConfig", "LLMProviderEnum"]
+__all__ = [
+    "LLMProvider", "LLMProviderConfig", "LLMConfig", "LLMProviderEnum",
+    "MCPSessionPool", "MCPSessionPoolConfig", "AnswerCache", "AnswerCacheConfig",
+    "SemanticCache", "SemanticCacheConfig", "JobManager", "JobManagerConfig", "JobStore",
+    "JobStoreFullError", "create_job_store", "Job", "JobStatus", "Histogram", "MetricsRegistry",
+    "EventLoopLagMonitor", "BatchQueryConfig",
+]
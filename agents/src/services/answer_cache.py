@@ -0,0 +1,133 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .schemas.cache_schemas import AnswerCacheConfig
+
+logger = logging.getLogger(__name__)
+
+# MCP tools that change what a collection returns; a call bumps its version
+COLLECTION_WRITE_TOOLS = frozenset({
+    "chroma_add_documents",
+    "chroma_bulk_add_documents",
+    "chroma_update_documents",
+    "chroma_delete_documents",
+    "chroma_modify_collection",
+    "chroma_delete_collection",
+})
+
+# MCP tool returning a token per collection that changes on any write, including ones made outside this process
+COLLECTION_VERSIONS_TOOL = "chroma_collection_versions"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", text).strip().lower().rstrip("?.! ")
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of final answers keyed on the normalized query,
+    collection, k, validation flag and the collection's version counter.
+    Bumping a collection's version makes all its entries unreachable; it is
+    bumped by this process's own write tool calls and whenever the MCP
+    server's version token for the collection changes.
+    """
+
+    def __init__(self, config: Optional[AnswerCacheConfig] = None):
+        self.config = config or AnswerCacheConfig()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._remote_versions: Dict[str, Optional[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self, collection_name: str) -> int:
+        return self._versions.get(collection_name, 0)
+
+    def _key(self, query_text: str, collection_name: str, k: int, validated: bool) -> Tuple:
+        return (normalize_query(query_text), collection_name, k, validated, self.version(collection_name))
+
+    def get(self, query_text: str, collection_name: str, k: int, validated: bool = False) -> Optional[Any]:
+        if not self.config.enabled:
+            return None
+        key = self._key(query_text, collection_name, k, validated)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, query_text: str, collection_name: str, k: int, value: Any, validated: bool = False,
+            version: Optional[int] = None) -> None:
+        """Store an answer; pass the version read before computing it to skip answers raced by a write."""
+        if not self.config.enabled:
+            return
+        if version is not None and version != self.version(collection_name):
+            return
+        key = self._key(query_text, collection_name, k, validated)
+        self._entries[key] = (time.monotonic() + self.config.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def bump_version(self, collection_name: str) -> int:
+        """Invalidate every cached answer for `collection_name`."""
+        self._versions[collection_name] = self.version(collection_name) + 1
+        stale = [key for key in self._entries if key[1] == collection_name]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+        logger.info(f"AnswerCache: Collection '{collection_name}' now at version "
+                    f"{self._versions[collection_name]}, dropped {len(stale)} entries")
+        return self._versions[collection_name]
+
+    def sync_version(self, collection_name: str, token: Optional[str]) -> bool:
+        """
+        Record the MCP server's version token for `collection_name`, bumping the
+        local version if it changed since the last sync. Returns whether it did.
+        """
+        changed = collection_name in self._remote_versions and self._remote_versions[collection_name] != token
+        self._remote_versions[collection_name] = token
+        if changed:
+            self.bump_version(collection_name)
+        return changed
+
+    def on_tool_call(self, name: str, arguments: Optional[Dict[str, Any]]) -> None:
+        """Bump the collection version after a successful MCP write tool call."""
+        if name in COLLECTION_WRITE_TOOLS and arguments and arguments.get("collection_name"):
+            self.bump_version(arguments["collection_name"])
+            if arguments.get("new_name"):
+                self.bump_version(arguments["new_name"])
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.config.max_entries,
+            "ttl_seconds": self.config.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .job_store import JobStore, InMemoryJobStore
+from .schemas.job_schemas import Job, JobManagerConfig, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a fixed pool of worker tasks.
+    Job records live in a JobStore; finished jobs expire after
+    `result_ttl_seconds`. On start, jobs queued before a restart are
+    requeued and jobs that were running are marked failed.
+    """
+
+    def __init__(self, handler: JobHandler, store: Optional[JobStore] = None,
+                 config: Optional[JobManagerConfig] = None):
+        self.handler = handler
+        self.config = config or JobManagerConfig()
+        self.store = store or InMemoryJobStore(self.config.max_jobs)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # Registered before a job leaves the queue; the task is None until the handler starts
+        self._running: Dict[str, Tuple[Optional[asyncio.Task], asyncio.Event]] = {}
+        self._cancel_requested: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._purge_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        for job in await self.store.unfinished():
+            if job.status == JobStatus.RUNNING:
+                await self._finish(job, JobStatus.FAILED, error="Interrupted by server restart")
+            else:
+                self._queue.put_nowait(job.job_id)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.config.workers)
+        ]
+        self._purge_task = asyncio.create_task(self._purge_loop(), name="job-purge")
+        logger.info(f"JobManager: Started {self.config.workers} workers, {self._queue.qsize()} jobs requeued")
+
+    async def aclose(self) -> None:
+        tasks = self._workers + ([self._purge_task] if self._purge_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._purge_task = None
+        await self.store.close()
+        logger.info("JobManager: Closed")
+
+    async def submit(self, request: Dict[str, Any]) -> Job:
+        job = Job(job_id=uuid.uuid4().hex, request=request, created_at=time.time())
+        await self.store.create(job)
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job. A finished job is removed from the
+        store instead. Returns the job's last state, or None if unknown.
+        """
+        job = await self.store.get(job_id)
+        if job is None:
+            return None
+        if job.finished:
+            await self.store.delete(job_id)
+            return job
+        if job.status == JobStatus.QUEUED:
+            # Conditional, so a worker that starts the job at the same moment wins or loses cleanly
+            if await self.store.transition(self._finished(job, JobStatus.CANCELLED), JobStatus.QUEUED):
+                return job
+        running = self._running.get(job_id)
+        if running is not None:
+            task, recorded = running
+            if task is None:
+                # The worker is between claiming the job and starting it; it checks this flag
+                self._cancel_requested.add(job_id)
+            else:
+                task.cancel()
+            # The worker records the outcome once the handler unwinds
+            await recorded.wait()
+        return await self.store.get(job_id)
+
+    def _finished(self, job: Job, status: JobStatus, result: Optional[Dict[str, Any]] = None,
+                  error: Optional[str] = None) -> Job:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.config.result_ttl_seconds
+        return job
+
+    async def _finish(self, job: Job, status: JobStatus, result: Optional[Dict[str, Any]] = None,
+                      error: Optional[str] = None) -> Job:
+        await self.store.update(self._finished(job, status, result, error))
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"JobManager: Failed to record job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.store.get(job_id)
+        if job is None or job.status != JobStatus.QUEUED:
+            # Cancelled or expired while waiting in the queue
+            return
+        recorded = asyncio.Event()
+        # Registered before the transition, so a cancel() that finds the job running can always reach it
+        self._running[job_id] = (None, recorded)
+        try:
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            if not await self.store.transition(job, JobStatus.QUEUED):
+                # Cancelled between the read and the start
+                return
+            if job_id in self._cancel_requested:
+                await self._finish(job, JobStatus.CANCELLED)
+                return
+            task = asyncio.create_task(self.handler(job.request))
+            self._running[job_id] = (task, recorded)
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                # Shutdown: leave the record as running, start() fails it on the next boot
+                task.cancel()
+                raise
+            if task.cancelled():
+                await self._finish(job, JobStatus.CANCELLED)
+            elif task.exception() is not None:
+                logger.warning(f"JobManager: Job {job_id} failed: {task.exception()}")
+                await self._finish(job, JobStatus.FAILED, error=str(task.exception()))
+            else:
+                await self._finish(job, JobStatus.SUCCEEDED, result=task.result())
+        finally:
+            self._running.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
+            recorded.set()
+        logger.info(f"JobManager: Job {job_id} {job.status.value} in {job.finished_at - job.started_at:.2f}s")
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.purge_interval_seconds)
+            try:
+                purged = await self.store.purge_expired()
+                if purged:
+                    logger.info(f"JobManager: Purged {purged} expired jobs")
+            except Exception as e:
+                logger.warning(f"JobManager: Purge failed: {e}")
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.config.backend,
+            "workers": len(self._workers),
+            "queued": self._queue.qsize(),
+            "running": len(self._running),
+            "stored": await self.store.count(),
+            "max_jobs": self.config.max_jobs,
+        }
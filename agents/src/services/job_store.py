@@ -0,0 +1,231 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .schemas.job_schemas import FINISHED_JOB_STATUSES, Job, JobManagerConfig, JobStatus
+
+
+class JobStoreFullError(RuntimeError):
+    """Raised when the store is at capacity and every job in it is still active."""
+
+
+class JobStore(ABC):
+    """
+    Bounded job record store. Finished jobs carry an `expires_at` and are
+    dropped once it passes; when full, the oldest finished job makes room.
+    """
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+
+    @abstractmethod
+    async def create(self, job: Job) -> None: ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]: ...
+
+    @abstractmethod
+    async def update(self, job: Job) -> None: ...
+
+    @abstractmethod
+    async def transition(self, job: Job, expected: JobStatus) -> bool:
+        """Write `job` only if the stored record's status is still `expected`; returns whether it was written."""
+
+    @abstractmethod
+    async def delete(self, job_id: str) -> bool: ...
+
+    @abstractmethod
+    async def purge_expired(self) -> int: ...
+
+    @abstractmethod
+    async def unfinished(self) -> List[Job]:
+        """Queued and running jobs, oldest first."""
+
+    @abstractmethod
+    async def count(self) -> int: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryJobStore(JobStore):
+
+    def __init__(self, max_jobs: int):
+        super().__init__(max_jobs)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def _expired(self, job: Job, now: float) -> bool:
+        return job.expires_at is not None and job.expires_at <= now
+
+    def _purge(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if self._expired(job, now)]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    async def create(self, job: Job) -> None:
+        if len(self._jobs) >= self.max_jobs:
+            self._purge()
+        if len(self._jobs) >= self.max_jobs:
+            oldest_finished = next((job_id for job_id, j in self._jobs.items() if j.finished), None)
+            if oldest_finished is None:
+                raise JobStoreFullError(f"Job store is full ({self.max_jobs} active jobs)")
+            del self._jobs[oldest_finished]
+        self._jobs[job.job_id] = job.model_copy()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if self._expired(job, time.time()):
+            del self._jobs[job_id]
+            return None
+        return job.model_copy()
+
+    async def update(self, job: Job) -> None:
+        if job.job_id in self._jobs:
+            self._jobs[job.job_id] = job.model_copy()
+
+    async def transition(self, job: Job, expected: JobStatus) -> bool:
+        # No await between the check and the write, so this is atomic on the event loop
+        stored = self._jobs.get(job.job_id)
+        if stored is None or stored.status != expected:
+            return False
+        self._jobs[job.job_id] = job.model_copy()
+        return True
+
+    async def delete(self, job_id: str) -> bool:
+        return self._jobs.pop(job_id, None) is not None
+
+    async def purge_expired(self) -> int:
+        return self._purge()
+
+    async def unfinished(self) -> List[Job]:
+        return [job.model_copy() for job in self._jobs.values() if not job.finished]
+
+    async def count(self) -> int:
+        return len(self._jobs)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a local SQLite file so queued jobs and results survive a restart.
+    Queries run in a worker thread to keep disk I/O off the event loop.
+    """
+
+    def __init__(self, path: str, max_jobs: int):
+        super().__init__(max_jobs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+            "expires_at REAL, data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+
+    def _run(self, fn, *args) -> Any:
+        with self._lock:
+            return fn(*args)
+
+    async def _call(self, fn, *args) -> Any:
+        return await asyncio.to_thread(self._run, fn, *args)
+
+    def _create(self, job: Job) -> None:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (count,) = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+            if count >= self.max_jobs:
+                count -= conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (time.time(),)).rowcount
+            if count >= self.max_jobs:
+                finished = tuple(status.value for status in FINISHED_JOB_STATUSES)
+                evicted = conn.execute(
+                    "DELETE FROM jobs WHERE job_id = (SELECT job_id FROM jobs WHERE status IN (?, ?, ?) "
+                    "ORDER BY created_at LIMIT 1)", finished
+                ).rowcount
+                if not evicted:
+                    raise JobStoreFullError(f"Job store is full ({self.max_jobs} active jobs)")
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, created_at, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+                (job.job_id, job.status.value, job.created_at, job.expires_at, job.model_dump_json())
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        row = self._conn.execute(
+            "SELECT data FROM jobs WHERE job_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, time.time())
+        ).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def _update(self, job: Job) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, expires_at = ?, data = ? WHERE job_id = ?",
+            (job.status.value, job.expires_at, job.model_dump_json(), job.job_id)
+        )
+
+    def _transition(self, job: Job, expected: JobStatus) -> bool:
+        return self._conn.execute(
+            "UPDATE jobs SET status = ?, expires_at = ?, data = ? WHERE job_id = ? AND status = ?",
+            (job.status.value, job.expires_at, job.model_dump_json(), job.job_id, expected.value)
+        ).rowcount > 0
+
+    def _delete(self, job_id: str) -> bool:
+        return self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount > 0
+
+    def _purge(self) -> int:
+        return self._conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _unfinished(self) -> List[Job]:
+        rows = self._conn.execute(
+            "SELECT data FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+        ).fetchall()
+        return [Job.model_validate_json(data) for (data,) in rows]
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    async def create(self, job: Job) -> None:
+        await self._call(self._create, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self._call(self._get, job_id)
+
+    async def update(self, job: Job) -> None:
+        await self._call(self._update, job)
+
+    async def transition(self, job: Job, expected: JobStatus) -> bool:
+        return await self._call(self._transition, job, expected)
+
+    async def delete(self, job_id: str) -> bool:
+        return await self._call(self._delete, job_id)
+
+    async def purge_expired(self) -> int:
+        return await self._call(self._purge)
+
+    async def unfinished(self) -> List[Job]:
+        return await self._call(self._unfinished)
+
+    async def count(self) -> int:
+        return await self._call(self._count)
+
+    async def close(self) -> None:
+        await self._call(self._conn.close)
+
+
+def create_job_store(config: JobManagerConfig) -> JobStore:
+    if config.backend == "sqlite":
+        return SQLiteJobStore(config.sqlite_path, config.max_jobs)
+    return InMemoryJobStore(config.max_jobs)
@@ -1,12 +1,14 @@
 import os
 import logging
-from typing import Any, Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 
-from .schemas.llm_schemas import LLMProviderConfig, LLMProviderEnum
+from .schemas.llm_schemas import LLMConfig, LLMProviderConfig, LLMProviderEnum
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -16,10 +18,55 @@ class LLMProvider:
     
     def __init__(self, config: Optional[LLMProviderConfig] = None):
         self.config = config or LLMProviderConfig()
+        self._clients: Dict[Tuple[LLMProviderEnum, LLMConfig], Any] = {}
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
         
     def get(self, provider: Optional[str] = None) -> Any:
         provider_enum = self._resolve_provider(provider)
-        return self._create_llm(provider_enum)
+        key = (provider_enum, self._llm_config(provider_enum))
+        llm = self._clients.get(key)
+        if llm is not None:
+            return llm
+        with self._lock:
+            llm = self._clients.get(key)
+            if llm is None:
+                llm = self._create_llm(provider_enum)
+                self._clients[key] = llm
+                logger.info(f"LLMProvider: Created {provider_enum.value} client for {key[1].model_name}")
+        return llm
+
+    async def aclose(self) -> None:
+        """Drop cached clients and close the shared HTTP connection pools."""
+        with self._lock:
+            self._clients.clear()
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+        logger.info("LLMProvider: Closed")
+
+    def _llm_config(self, provider: LLMProviderEnum) -> LLMConfig:
+        return getattr(self.config, provider.value)
+
+    def _http_limits(self) -> httpx.Limits:
+        pool = self.config.http_pool
+        return httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry_seconds,
+        )
+
+    def _shared_http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        # Called with self._lock held from get()
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._http_limits())
+        if self._http_async_client is None:
+            self._http_async_client = httpx.AsyncClient(limits=self._http_limits())
+        return self._http_client, self._http_async_client
     
     def _resolve_provider(self, provider: Optional[str]) -> LLMProviderEnum:
         if provider is None:
@@ -73,6 +120,7 @@ class LLMProvider:
         if not api_key:
             raise ValueError(f"{config.api_key_env} not set")
         
+        http_client, http_async_client = self._shared_http_clients()
         return ChatOpenAI(
             model=config.model_name,
             temperature=config.temperature,
@@ -80,4 +128,6 @@ class LLMProvider:
             timeout=config.timeout,
             max_retries=config.max_retries,
             api_key=api_key,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
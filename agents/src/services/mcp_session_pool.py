@@ -0,0 +1,276 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+import httpx
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp.types import Tool as MCPTool
+
+from .metrics import MetricsRegistry
+from .schemas.mcp_schemas import MCPSessionPoolConfig
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the underlying transport is gone, as opposed to a tool failing
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+class PooledSession:
+    """
+    A long-lived MCP ClientSession owned by a dedicated background task.
+    The SSE transport uses anyio cancel scopes, so the session must be opened
+    and closed by the same task; callers only ever borrow it.
+    """
+
+    def __init__(self, index: int, client: MultiServerMCPClient, server_name: str, max_concurrency: int):
+        self.index = index
+        self.client = client
+        self.server_name = server_name
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+        self.healthy = False
+        self.in_flight = 0
+        self.error: Optional[BaseException] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._own(), name=f"mcp-session-{self.index}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.error = TimeoutError(f"MCP session {self.index} did not connect within {timeout}s")
+            # Still inside the transport's connect, where setting _closing is never seen
+            self._task.cancel()
+        if not self.healthy:
+            await self.close()
+            raise self.error or RuntimeError(f"MCP session {self.index} failed to connect")
+
+    async def _own(self) -> None:
+        try:
+            async with self.client.session(self.server_name) as session:
+                self.session = session
+                self.healthy = True
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self.error = e
+            logger.warning(f"MCPSessionPool: Session {self.index} closed with error: {e}")
+        finally:
+            self.healthy = False
+            self.session = None
+            self._ready.set()
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except (Exception, asyncio.CancelledError):
+                pass
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        try:
+            return await self.session.call_tool(name, arguments)
+        except TRANSPORT_ERRORS:
+            self.healthy = False
+            raise
+
+    async def list_tools(self, cursor: Optional[str] = None) -> Any:
+        try:
+            return await self.session.list_tools(cursor=cursor)
+        except TRANSPORT_ERRORS:
+            self.healthy = False
+            raise
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MCPSessionPool: Health check failed for session {self.index}: {e}")
+            self.healthy = False
+            return False
+
+
+class MCPSessionPool:
+    """
+    Bounded pool of long-lived MCP sessions.
+    Sessions are health-checked in the background and reconnected on failure;
+    each session accepts at most `max_concurrency_per_session` borrowers.
+    """
+
+    def __init__(self, connections: Dict[str, Any], server_name: str = "chroma",
+                 config: Optional[MCPSessionPoolConfig] = None, metrics: Optional[MetricsRegistry] = None):
+        self.config = config or MCPSessionPoolConfig()
+        self.metrics = metrics or MetricsRegistry()
+        self.client = MultiServerMCPClient(connections)
+        self.server_name = server_name
+        self.sessions: List[PooledSession] = []
+        self.tools: List[MCPTool] = []
+        self._available = asyncio.Condition()
+        self._start_lock = asyncio.Lock()
+        self._reconnect_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._background: set = set()
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if not self._started:
+                await self._start()
+
+    async def _start(self) -> None:
+        self.sessions = [
+            PooledSession(i, self.client, self.server_name, self.config.max_concurrency_per_session)
+            for i in range(self.config.size)
+        ]
+        results = await asyncio.gather(
+            *(s.open(self.config.connect_timeout_seconds) for s in self.sessions),
+            return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if len(failures) == len(self.sessions):
+            raise RuntimeError(f"MCPSessionPool: No session could connect: {failures[0]}")
+        for failure in failures:
+            logger.warning(f"MCPSessionPool: Session failed to connect at startup: {failure}")
+        try:
+            await self.refresh_tools()
+        except BaseException:
+            # Don't leak the open sessions; a later start() opens a fresh set
+            await asyncio.gather(*(s.close() for s in self.sessions), return_exceptions=True)
+            self.sessions = []
+            raise
+        self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+        self._started = True
+        logger.info(f"MCPSessionPool: Started with {self.healthy_count}/{len(self.sessions)} sessions")
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.gather(*(s.close() for s in self.sessions), return_exceptions=True)
+        self.sessions = []
+        self._started = False
+        logger.info("MCPSessionPool: Closed")
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(1 for s in self.sessions if s.healthy)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(s.in_flight for s in self.sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.sessions),
+            "healthy": self.healthy_count,
+            "in_flight": self.in_flight,
+            "capacity": len(self.sessions) * self.config.max_concurrency_per_session,
+            "tools": len(self.tools),
+        }
+
+    def _pick(self) -> Optional[PooledSession]:
+        candidates = [s for s in self.sessions if s.healthy and not s.semaphore.locked()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: s.in_flight)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PooledSession]:
+        """Borrow a healthy session, waiting up to `acquire_timeout_seconds` for capacity."""
+        async with self._available:
+            try:
+                await asyncio.wait_for(
+                    self._available.wait_for(lambda: self._pick() is not None),
+                    timeout=self.config.acquire_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"No MCP session available within {self.config.acquire_timeout_seconds}s "
+                    f"({self.healthy_count} healthy, {self.in_flight} in flight)"
+                )
+            pooled = self._pick()
+            await pooled.semaphore.acquire()
+            pooled.in_flight += 1
+        try:
+            yield pooled
+        except TRANSPORT_ERRORS:
+            pooled.healthy = False
+            raise
+        finally:
+            pooled.in_flight -= 1
+            pooled.semaphore.release()
+            if not pooled.healthy:
+                task = asyncio.create_task(self._reconnect(pooled))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            async with self._available:
+                self._available.notify_all()
+
+    async def refresh_tools(self) -> List[MCPTool]:
+        """Re-list the server's tools through a pooled session."""
+        async with self.acquire() as session:
+            with self.metrics.timer("mcp_tool_load"):
+                tools = []
+                cursor = None
+                while True:
+                    page = await session.list_tools(cursor=cursor)
+                    tools.extend(page.tools or [])
+                    cursor = page.nextCursor
+                    if not cursor:
+                        break
+        self.tools = tools
+        return tools
+
+    async def _reconnect(self, pooled: PooledSession) -> None:
+        async with self._reconnect_lock:
+            if pooled not in self.sessions or pooled.healthy:
+                return
+            logger.info(f"MCPSessionPool: Reconnecting session {pooled.index}")
+            # Let in-flight borrowers finish before tearing the transport down
+            while pooled.in_flight:
+                await asyncio.sleep(0.05)
+            await pooled.close()
+            replacement = PooledSession(
+                pooled.index, self.client, self.server_name, self.config.max_concurrency_per_session
+            )
+            try:
+                await replacement.open(self.config.connect_timeout_seconds)
+            except Exception as e:
+                logger.warning(f"MCPSessionPool: Reconnect of session {pooled.index} failed: {e}")
+            self.sessions[self.sessions.index(pooled)] = replacement
+        async with self._available:
+            self._available.notify_all()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.health_check_interval_seconds)
+            for pooled in list(self.sessions):
+                if pooled.healthy and pooled.in_flight == 0:
+                    await pooled.ping(self.config.health_check_timeout_seconds)
+                if not pooled.healthy:
+                    await self._reconnect(pooled)
+            if not self.healthy_count:
+                continue
+            try:
+                await self.refresh_tools()
+            except Exception as e:
+                logger.warning(f"MCPSessionPool: Tool refresh failed: {e}")
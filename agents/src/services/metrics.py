@@ -0,0 +1,149 @@
+import asyncio
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from a fast cache lookup up to a long validated agent run
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Observing is a bisect and two additions,
+    and quantiles are estimated by interpolating inside the matching bucket.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One extra slot for observations above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.50)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process stage timings, counters and in-flight gauges.
+    Everything is updated from the event loop, so no locking is needed.
+    Stage timings and counters take an optional label (agent or tool name, route).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.gauges: Dict[str, int] = defaultdict(int)
+
+    def observe(self, stage: str, seconds: float, label: str = "") -> None:
+        histogram = self.histograms.get((stage, label))
+        if histogram is None:
+            histogram = self.histograms[(stage, label)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def increment(self, name: str, label: str = "", amount: int = 1) -> None:
+        self.counters[(name, label)] += amount
+
+    def counter(self, name: str) -> int:
+        """Total of a counter across all of its labels."""
+        return sum(value for (counter_name, _), value in self.counters.items() if counter_name == name)
+
+    @contextmanager
+    def timer(self, stage: str, label: str = "") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, label)
+
+    @contextmanager
+    def in_flight(self, gauge: str) -> Iterator[None]:
+        self.gauges[gauge] += 1
+        try:
+            yield
+        finally:
+            self.gauges[gauge] -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        stages: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for (stage, label), histogram in sorted(self.histograms.items()):
+            stages[stage][label or "all"] = histogram.snapshot()
+        counters: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for (name, label), value in sorted(self.counters.items()):
+            counters[name][label or "all"] = value
+        return {
+            "stages": dict(stages),
+            "counters": dict(counters),
+            "in_flight": dict(self.gauges),
+        }
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping task, which is how long
+    blocking work held the loop. Lag is recorded under the `event_loop_lag` stage.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, interval_seconds: float = 0.5):
+        self.metrics = metrics
+        self.interval_seconds = interval_seconds
+        self.last_lag_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-loop-lag")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.last_lag_seconds = max(0.0, loop.time() - scheduled)
+            self.metrics.observe("event_loop_lag", self.last_lag_seconds)
@@ -0,0 +1,84 @@
+import math
+from typing import Dict, Iterable, List, Optional
+
+from .metrics import MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "marag"
+
+# Prometheus label name for each labelled stage or counter
+LABEL_NAMES = {
+    "agent_hop": "agent",
+    "mcp_tool_call": "tool",
+    "mcp_tool_calls": "tool",
+    "mcp_tool_errors": "tool",
+    "http_request": "route",
+    "http_requests": "route",
+    "http_errors": "route",
+    "cache_hits": "cache",
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in labels.items() if value != ""]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registry: MetricsRegistry, gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    Render the registry in the Prometheus text exposition format.
+    Stages become `marag_<stage>_seconds` histograms, counters `marag_<name>_total`,
+    and in-flight gauges plus `gauges` (point-in-time values) `marag_<name>`.
+    """
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    # Snapshot the dicts so the loop is not affected by observations made elsewhere
+    histograms = sorted(list(registry.histograms.items()))
+    stages: Dict[str, list] = {}
+    for (stage, label), histogram in histograms:
+        stages.setdefault(stage, []).append((label, histogram))
+    for stage, series in stages.items():
+        name = f"{PREFIX}_{stage}_seconds"
+        label_name = LABEL_NAMES.get(stage, "name")
+        family(name, "histogram", f"Latency of the {stage} stage in seconds")
+        for label, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                cumulative += count
+                bucket_labels = _labels(**{label_name: label, "le": _number(float(bound))})
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _labels(**{label_name: label})
+            lines.append(f"{name}_sum{series_labels} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{series_labels} {histogram.count}")
+
+    counters: Dict[str, list] = {}
+    for (counter, label), value in sorted(list(registry.counters.items())):
+        counters.setdefault(counter, []).append((label, value))
+    for counter, series in counters.items():
+        name = f"{PREFIX}_{counter}_total"
+        label_name = LABEL_NAMES.get(counter, "name")
+        family(name, "counter", f"Total {counter.replace('_', ' ')}")
+        for label, value in series:
+            lines.append(f"{name}{_labels(**{label_name: label})} {value}")
+
+    point_in_time: Iterable = list(registry.gauges.items()) + sorted((gauges or {}).items())
+    for gauge, value in point_in_time:
+        name = f"{PREFIX}_{gauge}"
+        family(name, "gauge", gauge.replace("_", " ").capitalize())
+        lines.append(f"{name} {_number(value)}")
+
+    return "\n".join(lines) + "\n"
@@ -1,3 +1,10 @@
 from .llm_schemas import LLMProviderConfig, LLMConfig, LLMProviderEnum
+from .mcp_schemas import MCPSessionPoolConfig
+from .cache_schemas import AnswerCacheConfig, SemanticCacheConfig
+from .job_schemas import BatchQueryConfig, Job, JobManagerConfig, JobStatus
 
-__all__ = ["LLMProviderConfig", "LLMConfig", "LLMProviderEnum"]
+__all__ = [
+    "LLMProviderConfig", "LLMConfig", "LLMProviderEnum", "MCPSessionPoolConfig",
+    "AnswerCacheConfig", "SemanticCacheConfig", "Job", "JobManagerConfig", "JobStatus",
+    "BatchQueryConfig",
+]
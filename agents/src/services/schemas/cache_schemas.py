@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class AnswerCacheConfig(BaseModel):
+    enabled: bool = True
+    max_entries: int = Field(default=1024, ge=1)
+    ttl_seconds: float = Field(default=900.0, gt=0)
+
+
+class SemanticCacheConfig(BaseModel):
+    enabled: bool = True
+    similarity_threshold: float = Field(default=0.92, gt=0.0, le=1.0)
+    max_entries_per_collection: int = Field(default=512, ge=1)
+    ttl_seconds: float = Field(default=900.0, gt=0)
+    embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
@@ -0,0 +1,45 @@
+from enum import Enum
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_JOB_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class Job(BaseModel):
+    job_id: str
+    status: JobStatus = JobStatus.QUEUED
+    request: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_JOB_STATUSES
+
+
+class JobManagerConfig(BaseModel):
+    workers: int = Field(default=2, ge=1)
+    max_jobs: int = Field(default=1000, ge=1)
+    result_ttl_seconds: float = Field(default=3600.0, gt=0)
+    purge_interval_seconds: float = Field(default=60.0, gt=0)
+    backend: Literal["memory", "sqlite"] = "memory"
+    sqlite_path: str = "jobs.db"
+
+
+class BatchQueryConfig(BaseModel):
+    # Shared across all /query/batch requests, not per request
+    max_concurrency: int = Field(default=4, ge=1)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from enum import Enum
 
@@ -9,6 +9,9 @@ class LLMProviderEnum(str, Enum):
 
 
 class LLMConfig(BaseModel):
+    # Frozen so a config can key the provider's client registry
+    model_config = ConfigDict(frozen=True)
+
     model_name: str
     temperature: float = Field(default=0.0, ge=0.0, le=2.0)
     max_tokens: Optional[int] = None
@@ -17,6 +20,12 @@ class LLMConfig(BaseModel):
     api_key_env: str
 
 
+class HTTPPoolConfig(BaseModel):
+    max_connections: int = Field(default=100, ge=1)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry_seconds: float = Field(default=30.0, gt=0)
+
+
 class LLMProviderConfig(BaseModel):
     gemini: LLMConfig = Field(
         default=LLMConfig(
@@ -31,3 +40,4 @@ class LLMProviderConfig(BaseModel):
         )
     )
     default_provider: LLMProviderEnum = LLMProviderEnum.GEMINI
+    http_pool: HTTPPoolConfig = Field(default_factory=HTTPPoolConfig)
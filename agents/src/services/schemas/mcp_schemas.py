@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class MCPSessionPoolConfig(BaseModel):
+    size: int = Field(default=4, ge=1, le=64)
+    max_concurrency_per_session: int = Field(default=8, ge=1)
+    connect_timeout_seconds: float = Field(default=10.0, gt=0)
+    acquire_timeout_seconds: float = Field(default=30.0, gt=0)
+    health_check_interval_seconds: float = Field(default=30.0, gt=0)
+    health_check_timeout_seconds: float = Field(default=5.0, gt=0)
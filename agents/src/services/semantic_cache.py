@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .answer_cache import COLLECTION_WRITE_TOOLS
+from .schemas.cache_schemas import SemanticCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+class _CollectionIndex:
+    """Unit-normalized query vectors for one collection, one row per cached answer."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.k = np.empty(0, dtype=np.int64)
+        self.validated = np.empty(0, dtype=bool)
+        self.version = np.empty(0, dtype=np.int64)
+        self.expires_at = np.empty(0, dtype=np.float64)
+        self.last_used = np.empty(0, dtype=np.int64)
+        self.values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, vector: np.ndarray, k: int, validated: bool, version: int,
+               expires_at: float, tick: int, value: Any) -> None:
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        self.k = np.append(self.k, k)
+        self.validated = np.append(self.validated, validated)
+        self.version = np.append(self.version, version)
+        self.expires_at = np.append(self.expires_at, expires_at)
+        self.last_used = np.append(self.last_used, tick)
+        self.values.append(value)
+
+    def remove(self, rows: np.ndarray) -> None:
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        self.vectors = self.vectors[keep]
+        self.k = self.k[keep]
+        self.validated = self.validated[keep]
+        self.version = self.version[keep]
+        self.expires_at = self.expires_at[keep]
+        self.last_used = self.last_used[keep]
+        self.values = [v for v, kept in zip(self.values, keep) if kept]
+
+
+class SemanticCache:
+    """
+    Answer cache matched on query-embedding cosine similarity, so paraphrased
+    questions reuse a previous answer. Entries are scoped per collection,
+    only match the same k / validation flag / collection version, and are
+    evicted least-recently-used once a collection reaches its bound.
+    """
+
+    def __init__(self, embeddings: Any, config: Optional[SemanticCacheConfig] = None):
+        self.embeddings = embeddings
+        self.config = config or SemanticCacheConfig()
+        self._indexes: Dict[str, _CollectionIndex] = {}
+        self._ticks = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a query off the event loop and unit-normalize it."""
+        vector = np.asarray(await asyncio.to_thread(self.embeddings.embed_query, text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector: np.ndarray, collection_name: str, k: int, validated: bool,
+               version: int) -> Optional[Tuple[Any, float]]:
+        """Return (cached value, similarity) for the closest match above the threshold."""
+        index = self._indexes.get(collection_name)
+        if index is None or not len(index):
+            self.misses += 1
+            return None
+        similarities = index.vectors @ vector
+        eligible = (
+            (index.k == k)
+            & (index.validated == validated)
+            & (index.version == version)
+            & (index.expires_at > time.monotonic())
+        )
+        similarities = np.where(eligible, similarities, -np.inf)
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.config.similarity_threshold:
+            self.misses += 1
+            return None
+        index.last_used[best] = next(self._ticks)
+        self.hits += 1
+        return index.values[best], similarity
+
+    def put(self, vector: np.ndarray, collection_name: str, k: int, validated: bool,
+            version: int, value: Any) -> None:
+        index = self._indexes.get(collection_name)
+        if index is None:
+            index = self._indexes[collection_name] = _CollectionIndex(vector.shape[0])
+        stale = np.flatnonzero((index.expires_at <= time.monotonic()) | (index.version < version))
+        if len(stale):
+            index.remove(stale)
+            self.evictions += len(stale)
+        if len(index) >= self.config.max_entries_per_collection:
+            index.remove(np.array([int(np.argmin(index.last_used))]))
+            self.evictions += 1
+        index.append(vector, k, validated, version, time.monotonic() + self.config.ttl_seconds,
+                     next(self._ticks), value)
+
+    def invalidate(self, collection_name: str) -> None:
+        self._indexes.pop(collection_name, None)
+
+    def on_tool_call(self, name: str, arguments: Optional[Dict[str, Any]]) -> None:
+        if name in COLLECTION_WRITE_TOOLS and arguments and arguments.get("collection_name"):
+            self.invalidate(arguments["collection_name"])
+            if arguments.get("new_name"):
+                self.invalidate(arguments["new_name"])
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "entries": sum(len(index) for index in self._indexes.values()),
+            "collections": len(self._indexes),
+            "similarity_threshold": self.config.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,30 @@
+import logging
+import os
+
+from src.services.schemas.cache_schemas import AnswerCacheConfig, SemanticCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+def get_answer_cache_config() -> AnswerCacheConfig:
+    logger.debug("Creating answer cache configuration")
+
+    overrides = {
+        "enabled": os.getenv("ANSWER_CACHE_ENABLED"),
+        "max_entries": os.getenv("ANSWER_CACHE_MAX_ENTRIES"),
+        "ttl_seconds": os.getenv("ANSWER_CACHE_TTL_SECONDS"),
+    }
+    return AnswerCacheConfig(**{k: v for k, v in overrides.items() if v is not None})
+
+
+def get_semantic_cache_config() -> SemanticCacheConfig:
+    logger.debug("Creating semantic cache configuration")
+
+    overrides = {
+        "enabled": os.getenv("SEMANTIC_CACHE_ENABLED"),
+        "similarity_threshold": os.getenv("SEMANTIC_CACHE_SIMILARITY_THRESHOLD"),
+        "max_entries_per_collection": os.getenv("SEMANTIC_CACHE_MAX_ENTRIES_PER_COLLECTION"),
+        "ttl_seconds": os.getenv("SEMANTIC_CACHE_TTL_SECONDS"),
+        "embedding_model_name": os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL"),
+    }
+    return SemanticCacheConfig(**{k: v for k, v in overrides.items() if v is not None})
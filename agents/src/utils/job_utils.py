@@ -0,0 +1,28 @@
+import logging
+import os
+
+from src.services.schemas.job_schemas import BatchQueryConfig, JobManagerConfig
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_config() -> JobManagerConfig:
+    logger.debug("Creating job manager configuration")
+
+    overrides = {
+        "workers": os.getenv("JOBS_WORKERS"),
+        "max_jobs": os.getenv("JOBS_MAX_JOBS"),
+        "result_ttl_seconds": os.getenv("JOBS_RESULT_TTL_SECONDS"),
+        "backend": os.getenv("JOBS_BACKEND"),
+        "sqlite_path": os.getenv("JOBS_SQLITE_PATH"),
+    }
+    return JobManagerConfig(**{k: v for k, v in overrides.items() if v is not None})
+
+
+def get_batch_config() -> BatchQueryConfig:
+    logger.debug("Creating batch query configuration")
+
+    overrides = {
+        "max_concurrency": os.getenv("BATCH_MAX_CONCURRENCY"),
+    }
+    return BatchQueryConfig(**{k: v for k, v in overrides.items() if v is not None})
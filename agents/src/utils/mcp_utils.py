@@ -1,9 +1,12 @@
 
 import asyncio
 import logging
+import os
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_mcp_adapters.tools import load_mcp_tools
 
+from src.services.schemas.mcp_schemas import MCPSessionPoolConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,3 +23,15 @@ def get_mcp_server_config():
     }
     
     return server_config
+
+
+def get_mcp_pool_config() -> MCPSessionPoolConfig:
+    logger.debug("Creating MCP session pool configuration")
+
+    overrides = {
+        "size": os.getenv("MCP_POOL_SIZE"),
+        "max_concurrency_per_session": os.getenv("MCP_POOL_MAX_CONCURRENCY_PER_SESSION"),
+        "acquire_timeout_seconds": os.getenv("MCP_POOL_ACQUIRE_TIMEOUT_SECONDS"),
+        "health_check_interval_seconds": os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL_SECONDS"),
+    }
+    return MCPSessionPoolConfig(**{k: v for k, v in overrides.items() if v is not None})
@@ -1,14 +1,43 @@
+import time
+
 import requests
 
 class ApiClient:
-    def __init__(self, api_url):
+    def __init__(self, api_url, jobs_url=None, poll_interval=1.0, job_timeout=600):
         self.api_url = api_url
+        # Jobs live next to /query under the same API prefix
+        self.jobs_url = jobs_url or api_url.rsplit("/", 1)[0] + "/jobs"
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+
+    def submit_job(self, query_text):
+        resp = requests.post(self.jobs_url, json={"query_text": query_text}, timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_job(self, job_id):
+        resp = requests.get(f"{self.jobs_url}/{job_id}", timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    def cancel_job(self, job_id):
+        resp = requests.delete(f"{self.jobs_url}/{job_id}", timeout=30)
+        resp.raise_for_status()
+        return resp.json()
 
     def get_response(self, query_text):
-        payload = {"query_text": query_text}
+        """Run the query as a job and poll for it, so long agent runs don't hit HTTP timeouts."""
         try:
-            resp = requests.post(self.api_url, json=payload)
-            resp.raise_for_status()
-            return resp.json()
+            job = self.submit_job(query_text)
+            deadline = time.monotonic() + self.job_timeout
+            while job["status"] in ("queued", "running"):
+                if time.monotonic() > deadline:
+                    self.cancel_job(job["job_id"])
+                    return {"result": f"[API error: no response within {self.job_timeout}s]", "metadata": None}
+                time.sleep(self.poll_interval)
+                job = self.get_job(job["job_id"])
+            if job["status"] != "succeeded":
+                return {"result": f"[API error: {job.get('error') or job['status']}]", "metadata": None}
+            return job["result"]
         except Exception as e:
             return {"result": f"[API error: {e}]", "metadata": None}
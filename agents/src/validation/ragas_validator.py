@@ -14,9 +14,12 @@ from langchain_huggingface import HuggingFaceEmbeddings
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
 
 class RAGASValidator:
-    def __init__(self, llm_provider: LLMProvider, config: ValidationConfig = None):
+    def __init__(self, llm_provider: LLMProvider, config: ValidationConfig = None,
+                 embeddings: HuggingFaceEmbeddings = None):
         self.llm_provider = llm_provider
         self.config = config or ValidationConfig()
         self.metrics = [
@@ -25,7 +28,15 @@ class RAGASValidator:
             context_precision,
             context_recall
         ]
+        self._embeddings = embeddings
         # logger.info("RAGASValidator initialized")
+
+    @property
+    def embeddings(self) -> HuggingFaceEmbeddings:
+        # Loading the sentence-transformers model is expensive, so do it once
+        if self._embeddings is None:
+            self._embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+        return self._embeddings
     
     async def validate_response(self, validation_input: RAGASInput) -> ValidationResult:
         try:
@@ -35,7 +46,7 @@ class RAGASValidator:
                         f"contexts: {(validation_input.contexts)} items, "
                         f"answer: {(validation_input.answer)} chars")
             llm = self.llm_provider.get("gemini")
-            embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+            embeddings = self.embeddings
             
             # Create dataset with all columns for compatibility
             dataset_dict = {
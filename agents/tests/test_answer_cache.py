@@ -0,0 +1,112 @@
+"""
+Unit tests for the query answer cache
+"""
+
+import time
+from src.services.answer_cache import AnswerCache, normalize_query
+from src.services.schemas.cache_schemas import AnswerCacheConfig
+
+
+def test_normalized_queries_share_an_entry():
+    cache = AnswerCache()
+    cache.put("Does Spectrum support S3?", "docs", 5, "answer")
+
+    assert normalize_query("  does spectrum   support s3 ") == "does spectrum support s3"
+    assert cache.get("does spectrum support s3", "docs", 5) == "answer"
+    assert cache.get("does spectrum support s3", "docs", 2) is None
+    assert cache.get("does spectrum support s3", "other", 5) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_write_tool_bumps_collection_version():
+    cache = AnswerCache()
+    cache.put("query", "docs", 5, "answer")
+    cache.put("query", "other", 5, "other answer")
+
+    cache.on_tool_call("chroma_query_documents", {"collection_name": "docs"})
+    assert cache.get("query", "docs", 5) == "answer"
+
+    cache.on_tool_call("chroma_add_documents", {"collection_name": "docs"})
+    assert cache.version("docs") == 1
+    assert cache.get("query", "docs", 5) is None
+    assert cache.get("query", "other", 5) == "other answer"
+
+
+def test_lru_eviction_and_ttl():
+    cache = AnswerCache(AnswerCacheConfig(max_entries=2, ttl_seconds=0.05))
+    cache.put("a", "docs", 5, 1)
+    cache.put("b", "docs", 5, 2)
+    cache.get("a", "docs", 5)
+    cache.put("c", "docs", 5, 3)
+
+    assert cache.get("b", "docs", 5) is None
+    assert cache.get("a", "docs", 5) == 1
+
+    time.sleep(0.06)
+    assert cache.get("c", "docs", 5) is None
+    assert cache.stats()["evictions"] == 2
+
+
+def test_server_version_token_change_bumps_version():
+    cache = AnswerCache()
+    assert cache.sync_version("docs", "a:0:3") is False
+    cache.put("query", "docs", 5, "answer", version=cache.version("docs"))
+
+    assert cache.sync_version("docs", "a:0:3") is False
+    assert cache.get("query", "docs", 5) == "answer"
+
+    # e.g. the loader added documents straight to Chroma
+    assert cache.sync_version("docs", "a:0:4") is True
+    assert cache.get("query", "docs", 5) is None
+
+
+def test_pipeline_skips_caches_while_collection_version_is_unavailable():
+    import asyncio
+    import json
+    from contextlib import asynccontextmanager
+    from types import SimpleNamespace
+    from langchain_core.messages import AIMessage
+    from src.agents.pipeline import SupervisorPipeline
+    from src.api.models import QueryRequest
+
+    class Session:
+        token = None
+
+        async def call_tool(self, name, arguments):
+            if self.token is None:
+                raise RuntimeError("Collection docs does not exist")
+            return SimpleNamespace(isError=False, content=[SimpleNamespace(text=json.dumps({"docs": self.token}))])
+
+    class Supervisor:
+        runs = 0
+
+        async def astream(self, *args, **kwargs):
+            Supervisor.runs += 1
+            message = AIMessage(content=f"answer {Supervisor.runs}")
+            yield (), "updates", {"supervisor": {"messages": [message]}}
+
+    session = Session()
+    pipeline = SupervisorPipeline(llm_provider=None)
+    pipeline._initialized = True
+
+    @asynccontextmanager
+    async def borrow_session():
+        yield session, []
+
+    async def get_graph(mcp_tools):
+        return SimpleNamespace(supervisor=Supervisor(), tools=[], tracer=None)
+
+    pipeline._borrow_session = borrow_session
+    pipeline._get_graph = get_graph
+    request = QueryRequest(query_text="what changed?", collection_name="docs")
+
+    async def scenario():
+        assert (await pipeline.process_query(request)).result == "answer 1"
+        # The loader fills the collection; the answer from before must not be served
+        session.token = "e:0:10"
+        assert (await pipeline.process_query(request)).result == "answer 2"
+        assert (await pipeline.process_query(request)).result == "answer 2"
+        assert Supervisor.runs == 2
+
+    asyncio.run(scenario())
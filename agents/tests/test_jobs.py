@@ -0,0 +1,177 @@
+"""
+Unit tests for the background job manager and its stores
+"""
+
+import asyncio
+import pytest
+from src.services.job_manager import JobManager
+from src.services.job_store import InMemoryJobStore, JobStoreFullError, SQLiteJobStore
+from src.services.schemas.job_schemas import JobManagerConfig, JobStatus
+from src.utils.job_utils import get_batch_config
+
+
+async def _echo(payload):
+    if payload.get("fail"):
+        raise RuntimeError("boom")
+    if payload.get("slow"):
+        await asyncio.sleep(30)
+    return {"result": payload["query_text"]}
+
+
+async def _wait_finished(manager, job_id):
+    for _ in range(200):
+        job = await manager.get(job_id)
+        if job.finished:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.db"), max_jobs=2)
+    return InMemoryJobStore(max_jobs=2)
+
+
+def test_submit_poll_cancel(store):
+    async def scenario():
+        manager = JobManager(_echo, store, JobManagerConfig(workers=1, max_jobs=2))
+        await manager.start()
+        job = await manager.submit({"query_text": "hello"})
+        assert (await _wait_finished(manager, job.job_id)).result == {"result": "hello"}
+
+        failed = await manager.submit({"query_text": "x", "fail": True})
+        failed = await _wait_finished(manager, failed.job_id)
+        assert failed.status == JobStatus.FAILED and failed.error == "boom"
+
+        # Store holds 2 jobs; the oldest finished one makes room
+        slow = await manager.submit({"query_text": "x", "slow": True})
+        assert await manager.get(job.job_id) is None
+        await asyncio.sleep(0.05)
+        assert (await manager.get(slow.job_id)).status == JobStatus.RUNNING
+        assert (await manager.cancel(slow.job_id)).status == JobStatus.CANCELLED
+
+        # Cancelling a finished job discards it
+        assert (await manager.cancel(failed.job_id)).status == JobStatus.FAILED
+        assert await manager.get(failed.job_id) is None
+        await manager.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_full_store_rejects_and_results_expire():
+    async def scenario():
+        config = JobManagerConfig(workers=1, max_jobs=1, result_ttl_seconds=0.05)
+        manager = JobManager(_echo, config=config)
+        await manager.start()
+        job = await manager.submit({"query_text": "x", "slow": True})
+        with pytest.raises(JobStoreFullError):
+            await manager.submit({"query_text": "y"})
+        await manager.cancel(job.job_id)
+        job = await manager.submit({"query_text": "y"})
+        await _wait_finished(manager, job.job_id)
+        await asyncio.sleep(0.1)
+        assert await manager.get(job.job_id) is None
+        await manager.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_jobs_survive_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def first_run():
+        manager = JobManager(_echo, SQLiteJobStore(path, 10), JobManagerConfig(workers=1))
+        await manager.start()
+        done = await manager.submit({"query_text": "done"})
+        await _wait_finished(manager, done.job_id)
+        running = await manager.submit({"query_text": "x", "slow": True})
+        queued = await manager.submit({"query_text": "queued"})
+        await asyncio.sleep(0.05)
+        await manager.aclose()
+        return done.job_id, running.job_id, queued.job_id
+
+    async def second_run(done_id, running_id, queued_id):
+        manager = JobManager(_echo, SQLiteJobStore(path, 10), JobManagerConfig(workers=1))
+        await manager.start()
+        assert (await manager.get(done_id)).result == {"result": "done"}
+        assert (await manager.get(running_id)).status == JobStatus.FAILED
+        assert (await _wait_finished(manager, queued_id)).result == {"result": "queued"}
+        await manager.aclose()
+
+    asyncio.run(second_run(*asyncio.run(first_run())))
+
+
+def test_cancel_racing_worker_start_is_honoured(store):
+    async def scenario():
+        started = set()
+
+        async def record(payload):
+            started.add(payload["query_text"])
+            return {"result": payload["query_text"]}
+
+        manager = JobManager(record, store, JobManagerConfig(workers=1, max_jobs=2))
+        await manager.start()
+        for i in range(20):
+            job = await manager.submit({"query_text": str(i)})
+            # Yield so the worker may read the job as queued before the cancel lands
+            await asyncio.sleep(0)
+            cancelled = await manager.cancel(job.job_id)
+            final = await _wait_finished(manager, job.job_id)
+            if cancelled.status == JobStatus.CANCELLED:
+                assert final.status == JobStatus.CANCELLED and str(i) not in started
+            else:
+                assert final.status == JobStatus.SUCCEEDED
+            await manager.cancel(job.job_id)
+        await manager.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_batch_config_rejects_non_positive_concurrency(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_CONCURRENCY", "8")
+    assert get_batch_config().max_concurrency == 8
+    for value in ("0", "-1", "four"):
+        monkeypatch.setenv("BATCH_MAX_CONCURRENCY", value)
+        with pytest.raises(ValueError):
+            get_batch_config()
+
+
+def test_cancel_between_start_transition_and_handler_is_not_lost():
+    class PausingStore(InMemoryJobStore):
+        """Holds the worker right after its queued-to-running write has landed."""
+
+        def __init__(self):
+            super().__init__(max_jobs=10)
+            self.paused = asyncio.Event()
+            self.release = asyncio.Event()
+
+        async def transition(self, job, expected):
+            written = await super().transition(job, expected)
+            if written and job.status == JobStatus.RUNNING:
+                self.paused.set()
+                await self.release.wait()
+            return written
+
+    async def scenario():
+        started = []
+
+        async def record(payload):
+            started.append(payload)
+            return {}
+
+        store = PausingStore()
+        manager = JobManager(record, store, JobManagerConfig(workers=1))
+        await manager.start()
+        job = await manager.submit({"query_text": "x"})
+        await store.paused.wait()
+        cancel = asyncio.create_task(manager.cancel(job.job_id))
+        await asyncio.sleep(0.01)
+        store.release.set()
+        assert (await cancel).status == JobStatus.CANCELLED
+        assert (await manager.get(job.job_id)).status == JobStatus.CANCELLED
+        assert started == []
+        await manager.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+"""
+Unit tests for the fixed-bucket latency histograms and metrics registry
+"""
+
+import pytest
+from src.services.metrics import Histogram, MetricsRegistry
+from src.services.prometheus import render_prometheus
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in [0.05] * 50 + [0.15] * 45 + [0.4] * 4 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [50, 45, 4, 0, 1]
+    assert histogram.quantile(0.50) == pytest.approx(0.1)
+    assert histogram.quantile(0.95) == pytest.approx(0.2)
+    assert histogram.quantile(0.99) == pytest.approx(0.5)
+    # Overflow observations are reported at the last bound
+    assert histogram.quantile(1.0) == 1.0
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100 and snapshot["p50_ms"] == pytest.approx(100.0)
+
+
+def test_registry_timers_counters_and_gauges():
+    metrics = MetricsRegistry()
+    with metrics.in_flight("queries_in_flight"):
+        assert metrics.gauges["queries_in_flight"] == 1
+        with pytest.raises(RuntimeError):
+            with metrics.timer("mcp_tool_call", "chroma_query_documents"):
+                raise RuntimeError("tool failed")
+    metrics.increment("http_requests", "/api/v1/query")
+    metrics.increment("http_requests", "/api/v1/jobs", amount=2)
+
+    assert metrics.gauges["queries_in_flight"] == 0
+    assert metrics.counter("http_requests") == 3
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["mcp_tool_call"]["chroma_query_documents"]["count"] == 1
+    assert snapshot["counters"]["http_requests"] == {"/api/v1/jobs": 2, "/api/v1/query": 1}
+
+
+def test_prometheus_rendering_is_cumulative_and_labelled():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe("mcp_tool_call", 0.05, "chroma_query_documents")
+    metrics.observe("mcp_tool_call", 5.0, "chroma_query_documents")
+    metrics.increment("mcp_tool_calls", "chroma_query_documents", amount=2)
+
+    text = render_prometheus(metrics, {"mcp_pool_utilization": 0.25})
+    assert 'marag_mcp_tool_call_seconds_bucket{tool="chroma_query_documents",le="0.1"} 1' in text
+    assert 'marag_mcp_tool_call_seconds_bucket{tool="chroma_query_documents",le="1.0"} 1' in text
+    assert 'marag_mcp_tool_call_seconds_bucket{tool="chroma_query_documents",le="+Inf"} 2' in text
+    assert 'marag_mcp_tool_call_seconds_count{tool="chroma_query_documents"} 2' in text
+    assert 'marag_mcp_tool_calls_total{tool="chroma_query_documents"} 2' in text
+    assert "# TYPE marag_mcp_pool_utilization gauge\nmarag_mcp_pool_utilization 0.25" in text
+
+
+def test_request_middleware_times_streamed_responses_to_the_last_chunk():
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+    from main import record_request_metrics
+
+    app = FastAPI()
+    app.middleware("http")(record_request_metrics)
+    app.state.metrics = MetricsRegistry()
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield "first\n"
+            await asyncio.sleep(0.2)
+            yield "last\n"
+        return StreamingResponse(body(), media_type="text/plain")
+
+    response = TestClient(app).get("/stream")
+    assert response.text == "first\nlast\n"
+    histogram = app.state.metrics.histograms[("http_request", "/stream")]
+    assert histogram.count == 1 and histogram.sum >= 0.2
+    assert app.state.metrics.gauges["http_requests_in_flight"] == 0
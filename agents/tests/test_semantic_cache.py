@@ -0,0 +1,53 @@
+"""
+Unit tests for the embedding-similarity answer cache
+"""
+
+import asyncio
+from src.services.semantic_cache import SemanticCache
+from src.services.schemas.cache_schemas import SemanticCacheConfig
+
+
+class KeywordEmbeddings:
+    """Deterministic bag-of-keywords embedder standing in for the HuggingFace model."""
+
+    vocabulary = ["spectrum", "s3", "aws", "export", "dataflow"]
+
+    def embed_query(self, text):
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(term)) for term in self.vocabulary]
+
+
+def _cache(**config):
+    return SemanticCache(KeywordEmbeddings(), SemanticCacheConfig(similarity_threshold=0.9, **config))
+
+
+def test_paraphrase_hits_same_collection_only():
+    cache = _cache()
+    stored = asyncio.run(cache.embed("does spectrum support s3"))
+    cache.put(stored, "docs", 5, False, 0, "answer")
+
+    paraphrase = asyncio.run(cache.embed("is AWS S3 supported by Spectrum?"))
+    assert cache.lookup(paraphrase, "docs", 5, False, 0) is None  # "aws" pulls it below 0.9
+
+    paraphrase = asyncio.run(cache.embed("is S3 supported by spectrum?"))
+    value, similarity = cache.lookup(paraphrase, "docs", 5, False, 0)
+    assert value == "answer" and similarity > 0.99
+    assert cache.lookup(paraphrase, "other", 5, False, 0) is None
+    assert cache.lookup(paraphrase, "docs", 2, False, 0) is None
+    assert cache.lookup(paraphrase, "docs", 5, False, 1) is None
+
+
+def test_write_invalidates_and_lru_evicts():
+    cache = _cache(max_entries_per_collection=2)
+    vectors = [asyncio.run(cache.embed(text)) for text in ["spectrum s3", "export dataflow", "aws"]]
+    cache.put(vectors[0], "docs", 5, False, 0, "first")
+    cache.put(vectors[1], "docs", 5, False, 0, "second")
+    assert cache.lookup(vectors[0], "docs", 5, False, 0)[0] == "first"
+    cache.put(vectors[2], "docs", 5, False, 0, "third")
+
+    assert cache.lookup(vectors[1], "docs", 5, False, 0) is None
+    assert cache.lookup(vectors[0], "docs", 5, False, 0)[0] == "first"
+
+    cache.on_tool_call("chroma_delete_documents", {"collection_name": "docs", "ids": ["x"]})
+    assert cache.lookup(vectors[0], "docs", 5, False, 0) is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,77 @@
+"""Cache of Chroma collection handles so tools skip the get_collection round trip."""
+
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class CollectionHandleCache:
+    """
+    Collection handles keyed by name, each valid for `ttl_seconds`. Deletes and
+    renames made through this server invalidate their names right away; the TTL
+    bounds how long a handle outlives changes made by other clients. A load
+    racing an invalidation is not stored. `ttl_seconds` of 0 disables the cache.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._client = None
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def configure(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries.clear()
+
+    async def get(self, client: Any, collection_name: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        if client is not self._client:
+            # Handles belong to the client that created them
+            self._entries.clear()
+            self._client = client
+        if self.enabled:
+            entry = self._entries.get(collection_name)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        generation = self._generations[collection_name]
+        collection = await load()
+        if self.enabled and generation == self._generations[collection_name]:
+            self._entries[collection_name] = (time.monotonic() + self.ttl_seconds, collection)
+        return collection
+
+    def invalidate(self, *collection_names: str) -> None:
+        for name in collection_names:
+            if name:
+                self._generations[name] += 1
+                self._entries.pop(name, None)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        stats = self.stats()
+        return {
+            "collection_cache_entries": stats["entries"],
+            "collection_cache_hit_ratio": stats["hit_ratio"],
+        }
@@ -0,0 +1,90 @@
+"""Bounded thread-pool offload and per-tool concurrency limits for blocking Chroma calls."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+
+def parse_tool_limits(spec: Optional[str]) -> Dict[str, int]:
+    """Parse 'tool=limit,tool=limit' into a dict, e.g. 'chroma_add_documents=2'."""
+    limits: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        if not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid tool concurrency limit '{item.strip()}', expected tool=positive integer")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+class ToolExecutor:
+    """
+    Runs synchronous chromadb calls on a bounded thread pool so the event loop
+    keeps serving other sessions, and caps how many calls of each tool run at
+    once. Tools without an explicit limit share `default_limit`.
+    """
+
+    def __init__(self, max_workers: int = 16, default_limit: int = 8, limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.in_flight = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, max_workers: int, default_limit: int, limits: Optional[Dict[str, int]] = None) -> None:
+        """Apply new settings; the pool and semaphores are rebuilt on next use."""
+        self.shutdown()
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self._semaphores = {}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chroma-mcp")
+        return self._pool
+
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        # Semaphores bind to the loop they first wait on
+        if self._semaphore_loop is not loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        semaphore = self._semaphores.get(tool_name)
+        if semaphore is None:
+            limit = self.limits.get(tool_name, self.default_limit)
+            semaphore = self._semaphores[tool_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, tool_name: str) -> AsyncIterator[None]:
+        """Hold one of the tool's concurrency slots."""
+        async with self._semaphore(tool_name):
+            yield
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on the pool and await its result."""
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "executor_max_workers": self.max_workers,
+            "executor_in_flight": self.in_flight,
+            "executor_utilization": round(min(self.in_flight, self.max_workers) / self.max_workers, 4),
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
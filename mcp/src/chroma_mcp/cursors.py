@@ -0,0 +1,231 @@
+"""Keyset pagination over collection IDs with opaque cursors."""
+
+import base64
+import binascii
+import hashlib
+import heapq
+import json
+import time
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def filter_key(where: Optional[Dict], where_document: Optional[Dict]) -> str:
+    """Short stable digest of a filter pair, so a cursor can only be resumed with the filters it was made for."""
+    payload = json.dumps([where, where_document], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def encode_cursor(collection_name: str, snapshot: str, filters: str, last_id: str) -> str:
+    payload = json.dumps(
+        {"c": collection_name, "s": snapshot, "f": filters, "after": last_id}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode("ascii")
+
+
+def decode_cursor(cursor: str, collection_name: str, filters: str) -> Tuple[str, str]:
+    """
+    The snapshot token and last ID of the previous page; raises ValueError for
+    a malformed cursor, or one made for another collection or other filters.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        owner, snapshot, cursor_filters, last_id = payload["c"], payload["s"], payload["f"], payload["after"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if owner != collection_name:
+        raise ValueError(f"Cursor belongs to collection '{owner}', not '{collection_name}'.")
+    if cursor_filters != filters:
+        raise ValueError("Cursor was created with different 'where'/'where_document' filters.")
+    return snapshot, last_id
+
+
+def write_sorted_run(path: Path, ids: List[str]) -> None:
+    """Write `ids` sorted, one JSON string per line."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(doc_id) + "\n" for doc_id in sorted(ids))
+
+
+def _read_ids(path: Path) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+class IdSpill:
+    """
+    A sorted, de-duplicated ID list in a file, one JSON string per line, with
+    the byte offset of every `index_every`-th line kept in memory. Finding the
+    IDs after a cursor bisects that sparse index and scans at most one block,
+    so a page costs the same however deep it is, and memory stays at
+    count / index_every entries whatever the size of the collection.
+    """
+
+    def __init__(self, path: Path, index_every: int = 1024):
+        self.path = path
+        self.index_every = index_every
+        self.count = 0
+        self._keys: List[str] = []
+        self._offsets: List[int] = []
+
+    @classmethod
+    def merge(cls, path: Path, runs: List[Path], index_every: int = 1024) -> "IdSpill":
+        """Merge sorted run files into one spill, dropping duplicate IDs."""
+        spill = cls(path, index_every)
+        offset = 0
+        with open(path, "wb") as f:
+            for doc_id, _ in groupby(heapq.merge(*(_read_ids(run) for run in runs))):
+                if spill.count % index_every == 0:
+                    spill._keys.append(doc_id)
+                    spill._offsets.append(offset)
+                line = (json.dumps(doc_id) + "\n").encode("utf-8")
+                f.write(line)
+                offset += len(line)
+                spill.count += 1
+        return spill
+
+    def ids_after(self, last_id: Optional[str], limit: int) -> Tuple[List[str], bool]:
+        """Up to `limit` IDs after `last_id`, and whether more follow."""
+        block = bisect_right(self._keys, last_id) - 1 if last_id is not None else 0
+        if block < 0 or not self._offsets:
+            block = 0
+        ids: List[str] = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[block] if self._offsets else 0)
+            for line in f:
+                doc_id = json.loads(line)
+                if last_id is not None and doc_id <= last_id:
+                    continue
+                if len(ids) == limit:
+                    return ids, True
+                ids.append(doc_id)
+        return ids, False
+
+    def unlink(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class IdSnapshots:
+    """
+    Sorted ID snapshots pinned for the lifetime of an iteration or export.
+    Chroma cannot filter on an ID range or seek past a key, so a snapshot is
+    built once: the matching IDs are read in `page_size` limit/offset pages,
+    sorted `run_size` at a time into run files and merged into an IdSpill
+    under `directory`. Every page after that is located in the spill and
+    fetched by ID, and memory stays bounded by `run_size` while building and
+    by the spill's sparse index afterwards.
+
+    IDs written while a snapshot is being read may be missed, since the build
+    pages by offset; duplicates are dropped. `max_ids`, if set, refuses
+    snapshots larger than that. At most `max_snapshots` are kept (least
+    recently used first out) and one idle for `idle_seconds` is deleted; a
+    cursor whose snapshot is gone takes a fresh one and resumes after its
+    last ID.
+    """
+
+    def __init__(self, directory: str, page_size: int = 10_000, run_size: int = 100_000,
+                 index_every: int = 1024, max_ids: Optional[int] = None, max_snapshots: int = 16,
+                 idle_seconds: float = 600.0):
+        self.directory = Path(directory)
+        self.page_size = page_size
+        self.run_size = run_size
+        self.index_every = index_every
+        self.max_ids = max_ids
+        self.max_snapshots = max_snapshots
+        self.idle_seconds = idle_seconds
+        self.builds = 0
+        self._snapshots: "OrderedDict[str, Tuple[float, IdSpill]]" = OrderedDict()
+
+    def configure(self, directory: str, max_ids: Optional[int]) -> None:
+        """Set the spill directory, removing spills a previous process left behind, and the size guard."""
+        self.clear()
+        self.directory = Path(directory)
+        self.max_ids = max_ids or None
+        if self.directory.is_dir():
+            for leftover in self.directory.glob("*.ids*"):
+                leftover.unlink(missing_ok=True)
+
+    async def create(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[List[str]]],
+        run: Callable[..., Awaitable[Any]]
+    ) -> Tuple[str, IdSpill]:
+        """
+        Build a snapshot from `fetch_page(offset, limit)`; `run` executes the
+        blocking file work. Raises ValueError when more than `max_ids` match.
+        """
+        token = uuid.uuid4().hex
+        await run(self.directory.mkdir, parents=True, exist_ok=True)
+        runs: List[Path] = []
+        buffer: List[str] = []
+        offset = 0
+        try:
+            while True:
+                ids = await fetch_page(offset, self.page_size)
+                offset += len(ids)
+                buffer.extend(ids)
+                if self.max_ids is not None and offset > self.max_ids:
+                    raise ValueError(
+                        f"More than {self.max_ids} documents match; narrow the selection with 'where' "
+                        f"or raise the ID snapshot limit (--iter-max-ids)."
+                    )
+                last = len(ids) < self.page_size
+                if buffer and (last or len(buffer) >= self.run_size):
+                    runs.append(self.directory / f"{token}.ids.run{len(runs)}")
+                    await run(write_sorted_run, runs[-1], buffer)
+                    buffer = []
+                if last:
+                    break
+            spill = await run(IdSpill.merge, self.directory / f"{token}.ids", runs, self.index_every)
+        finally:
+            for run_path in runs:
+                await run(run_path.unlink, missing_ok=True)
+        self.builds += 1
+        self._expire()
+        self._snapshots[token] = (time.monotonic() + self.idle_seconds, spill)
+        while len(self._snapshots) > self.max_snapshots:
+            _, (_, evicted) = self._snapshots.popitem(last=False)
+            evicted.unlink()
+        return token, spill
+
+    def get(self, token: str) -> Optional[IdSpill]:
+        self._expire()
+        entry = self._snapshots.get(token)
+        if entry is None:
+            return None
+        self._snapshots[token] = (time.monotonic() + self.idle_seconds, entry[1])
+        self._snapshots.move_to_end(token)
+        return entry[1]
+
+    def drop(self, token: str) -> None:
+        entry = self._snapshots.pop(token, None)
+        if entry is not None:
+            entry[1].unlink()
+
+    def clear(self) -> None:
+        for token in list(self._snapshots):
+            self.drop(token)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for token in [token for token, (expires, _) in self._snapshots.items() if expires <= now]:
+            self.drop(token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "snapshots": len(self._snapshots),
+            "ids": sum(spill.count for _, spill in self._snapshots.values()),
+            "builds": self.builds,
+            "max_ids": self.max_ids,
+            "directory": str(self.directory),
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        return {
+            "id_snapshots": len(self._snapshots),
+            "id_snapshot_ids": sum(spill.count for _, spill in self._snapshots.values()),
+        }
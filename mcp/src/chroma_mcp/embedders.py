@@ -0,0 +1,209 @@
+"""Process-wide embedding functions and micro-batching of concurrent embedding requests."""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chroma_mcp.embedding_cache import embedding_function_key
+from chroma_mcp.singleflight import SingleFlight
+
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent `embed()` calls for up to `max_wait_ms`, or
+    until `max_batch_size` texts are waiting, then embeds them in one call to
+    the embedding function and hands each caller its own slice of the vectors.
+    An error in the batched call fails every request in that batch.
+
+    Only one batch per batcher runs at a time: requests arriving meanwhile
+    queue up and go out as the next batch as soon as it finishes, so batches
+    grow with load instead of piling up behind the worker. Requests larger
+    than `max_batch_size` are embedded a chunk at a time, letting small
+    requests in between rather than waiting for the whole ingest.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Any,
+        run: Callable[..., Awaitable[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.embedding_function = embedding_function
+        self.run = run
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = False
+        self._tasks: set = set()
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        if not texts:
+            return []
+        if len(texts) > self.max_batch_size:
+            vectors = []
+            for start in range(0, len(texts), self.max_batch_size):
+                vectors.extend(await self.embed(texts[start:start + self.max_batch_size]))
+            return vectors
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+        self.requests += 1
+        if self._pending_texts >= self.max_batch_size or self.max_wait_ms <= 0:
+            self._flush()
+        elif self._timer is None and not self._running:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._pending:
+            return
+        batch, batch_texts = [], 0
+        while self._pending and (not batch or batch_texts + len(self._pending[0][0]) <= self.max_batch_size):
+            request_texts, future = self._pending.pop(0)
+            self._pending_texts -= len(request_texts)
+            if not future.done():
+                batch.append((request_texts, future))
+                batch_texts += len(request_texts)
+        if not batch:
+            return
+        self._running = True
+        task = asyncio.ensure_future(self._run_batch(batch))
+        # Keep a reference so the batch is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        self.batches += 1
+        self.texts += len(texts)
+        try:
+            vectors = await self.run(self.embedding_function, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._running = False
+            if self._pending:
+                self._flush()
+        offset = 0
+        for request_texts, future in batch:
+            if not future.done():
+                request_vectors = vectors[offset:offset + len(request_texts)]
+                future.set_result([np.asarray(vector, dtype=np.float32) for vector in request_vectors])
+            offset += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "pending_texts": self._pending_texts,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class EmbedderRegistry:
+    """
+    Embedding functions created once per process by name, and one MicroBatcher
+    per embedding function identity, so every tool that embeds with the same
+    model shares its instance and its batches.
+    """
+
+    def __init__(
+        self,
+        factories: Dict[str, Callable[[], Any]],
+        run: Callable[..., Awaitable[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self.factories = factories
+        self.run = run
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._functions: Dict[str, Any] = {}
+        self._configured: Dict[str, Any] = {}
+        # Model loading blocks, and concurrent first requests should load it only once
+        self._loads = SingleFlight()
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+    def configure(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        for batcher in self._batchers.values():
+            batcher.max_batch_size = max_batch_size
+            batcher.max_wait_ms = max_wait_ms
+
+    async def get(self, name: str) -> Any:
+        """The shared embedding function for `name`, created on first use."""
+        if name in self._functions:
+            return self._functions[name]
+        if name not in self.factories:
+            raise ValueError(f"Unknown embedding function '{name}'. Known: {sorted(self.factories)}")
+        function = await self._loads.do(name, lambda: self.run(self.factories[name]))
+        return self._functions.setdefault(name, function)
+
+    async def for_configuration(
+        self, configuration_json: Optional[Dict[str, Any]], build: Callable[[], Any]
+    ) -> Optional[Any]:
+        """
+        The shared embedding function described by a collection's stored
+        configuration, or None if it records none. A known function with no
+        config is the registry's own instance; any other is built once per
+        distinct config with `build`, from the collection's public
+        configuration.
+        """
+        spec = (configuration_json or {}).get("embedding_function")
+        if not spec or spec.get("type") == "legacy":
+            return None
+        key = json.dumps(spec, sort_keys=True, default=str)
+        if key in self._configured:
+            return self._configured[key]
+        if spec.get("type") == "known" and not spec.get("config") and spec.get("name") in self.factories:
+            function = await self.get(spec["name"])
+        else:
+            function = await self._loads.do(key, lambda: self.run(build))
+        if function is not None:
+            self._configured[key] = function
+        return function
+
+    def batcher(self, embedding_function: Any) -> MicroBatcher:
+        key = embedding_function_key(embedding_function)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(embedding_function, self.run, self.max_batch_size, self.max_wait_ms)
+            self._batchers[key] = batcher
+        return batcher
+
+    async def embed(self, embedding_function: Any, texts: List[str]) -> List[np.ndarray]:
+        return await self.batcher(embedding_function).embed(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": sorted(self._functions),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batchers": [batcher.stats() for batcher in self._batchers.values()],
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        batches = sum(batcher.batches for batcher in self._batchers.values())
+        texts = sum(batcher.texts for batcher in self._batchers.values())
+        return {
+            "embedder_pending_texts": sum(batcher._pending_texts for batcher in self._batchers.values()),
+            "embedder_batches": batches,
+            "embedder_mean_batch_size": round(texts / batches, 2) if batches else 0.0,
+        }
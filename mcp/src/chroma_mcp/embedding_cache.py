@@ -0,0 +1,130 @@
+"""LRU cache of query embeddings, bounded by memory and keyed per embedding function."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Rough per-entry cost of the key, OrderedDict slot and array header on top of the vector data
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def embedding_function_key(embedding_function: Any) -> str:
+    """Identity of an embedding function: its name and config, so equal configs share entries."""
+    try:
+        return json.dumps(
+            {"name": embedding_function.name(), "config": embedding_function.get_config()},
+            sort_keys=True,
+            default=str
+        )
+    except Exception:
+        # Legacy functions without name/config can only be trusted per instance
+        cls = type(embedding_function)
+        return f"{cls.__module__}.{cls.__qualname__}:{id(embedding_function)}"
+
+
+class QueryEmbeddingCache:
+    """
+    Maps (embedding function identity, sha256 of the query text) to a float32
+    vector. Least recently used vectors are evicted once `max_bytes` is exceeded;
+    a budget of 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def configure(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._evict()
+
+    @staticmethod
+    def _key(function_key: str, text: str) -> Tuple[str, bytes]:
+        return function_key, hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get(self, function_key: str, text: str) -> Optional[np.ndarray]:
+        key = self._key(function_key, text)
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, function_key: str, text: str, vector: Any) -> None:
+        if not self.enabled:
+            return
+        key = self._key(function_key, text)
+        vector = np.asarray(vector, dtype=np.float32)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous.nbytes + _ENTRY_OVERHEAD_BYTES
+        self._entries[key] = vector
+        self.bytes += vector.nbytes + _ENTRY_OVERHEAD_BYTES
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and self.bytes > self.max_bytes:
+            _, vector = self._entries.popitem(last=False)
+            self.bytes -= vector.nbytes + _ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        stats = self.stats()
+        return {
+            "query_embedding_cache_entries": stats["entries"],
+            "query_embedding_cache_bytes": stats["bytes"],
+            "query_embedding_cache_hit_ratio": stats["hit_ratio"],
+        }
+
+
+async def embed_queries(cache: QueryEmbeddingCache, embedding_function: Any, texts: List[str],
+                        embed: Any) -> List[np.ndarray]:
+    """
+    Return one vector per text, embedding only texts not already cached.
+    `embed(embedding_function, texts)` computes the missing vectors, e.g. EmbedderRegistry.embed.
+    """
+    function_key = embedding_function_key(embedding_function)
+    vectors: Dict[str, np.ndarray] = {}
+    missing: List[str] = []
+    for text in dict.fromkeys(texts):
+        vector = cache.get(function_key, text)
+        if vector is None:
+            missing.append(text)
+        else:
+            vectors[text] = vector
+    if missing:
+        computed = await embed(embedding_function, missing)
+        for text, vector in zip(missing, computed):
+            vector = np.asarray(vector, dtype=np.float32)
+            cache.put(function_key, text, vector)
+            vectors[text] = vector
+    return [vectors[text] for text in texts]
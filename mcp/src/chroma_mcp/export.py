@@ -0,0 +1,125 @@
+"""Streaming writers for exporting a collection to JSONL or an .npy + .jsonl pair."""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+EXPORT_FORMATS = ("jsonl", "npy")
+
+# Fixed .npy header size, so the row count can be rewritten in place once it is known
+_NPY_HEADER_BYTES = 128
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def resolve_export_path(export_dir: str, file_name: str) -> Path:
+    """`file_name` inside `export_dir`; raises ValueError if it would escape the directory."""
+    base = Path(export_dir).resolve()
+    path = (base / file_name).resolve()
+    if path == base or base not in path.parents:
+        raise ValueError(f"Export file '{file_name}' must be a path inside the export directory.")
+    return path
+
+
+def _json_default(value: Any) -> Any:
+    return value.tolist() if hasattr(value, "tolist") else str(value)
+
+
+class NpyStreamWriter:
+    """
+    Writes float32 rows to an .npy file as they arrive. The header is reserved
+    up front and its shape is filled in on close, so the vectors never need to
+    be held in memory together.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        self.dimension: Optional[int] = None
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * _NPY_HEADER_BYTES)
+
+    def write(self, vectors: Any) -> None:
+        array = np.asarray(vectors, dtype="<f4")
+        if array.size == 0:
+            return
+        if self.dimension is None:
+            self.dimension = array.shape[1]
+        elif array.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension changed from {self.dimension} to {array.shape[1]} during export.")
+        self._file.write(np.ascontiguousarray(array).tobytes())
+        self.rows += array.shape[0]
+
+    def close(self) -> None:
+        header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (self.rows, self.dimension or 0)
+        padding = _NPY_HEADER_BYTES - len(_NPY_MAGIC) - 2 - len(header) - 1
+        self._file.seek(0)
+        self._file.write(_NPY_MAGIC + struct.pack("<H", len(header) + padding + 1) + header.encode("latin1")
+                         + b" " * padding + b"\n")
+        self._file.close()
+
+
+class CollectionExportWriter:
+    """
+    Writes pages of `collection.get` results. `jsonl` puts one record per line
+    with its embedding when requested; `npy` writes the embeddings to
+    `<name>.npy` and the rest of each record, in the same row order, to
+    `<name>.jsonl`. Files are written to a temporary name and renamed on
+    success, so a failed export never leaves a truncated file behind.
+    """
+
+    def __init__(self, path: Path, export_format: str, include_embeddings: bool):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}'. Options: {list(EXPORT_FORMATS)}")
+        self.export_format = export_format
+        self.include_embeddings = include_embeddings or export_format == "npy"
+        stem = path.with_suffix("") if path.suffix in (".jsonl", ".npy") else path
+        self.paths: Dict[str, Path] = {"jsonl": stem.with_suffix(".jsonl")}
+        if export_format == "npy":
+            self.paths["npy"] = stem.with_suffix(".npy")
+        self.rows = 0
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        self._records = open(self._partial(self.paths["jsonl"]), "w", encoding="utf-8")
+        self._vectors = NpyStreamWriter(self._partial(self.paths["npy"])) if export_format == "npy" else None
+
+    @staticmethod
+    def _partial(path: Path) -> Path:
+        return path.with_name(path.name + ".partial")
+
+    def write_page(self, page: Dict[str, Any]) -> None:
+        documents = page.get("documents")
+        metadatas = page.get("metadatas")
+        embeddings = page.get("embeddings")
+        lines: List[str] = []
+        for row, doc_id in enumerate(page["ids"]):
+            record = {
+                "id": doc_id,
+                "document": documents[row] if documents is not None else None,
+                "metadata": metadatas[row] if metadatas is not None else None,
+            }
+            if self._vectors is None and self.include_embeddings and embeddings is not None:
+                record["embedding"] = embeddings[row]
+            lines.append(json.dumps(record, default=_json_default, ensure_ascii=False))
+        if lines:
+            self._records.write("\n".join(lines) + "\n")
+        if self._vectors is not None and embeddings is not None:
+            self._vectors.write(embeddings)
+        self.rows += len(page["ids"])
+
+    def close(self) -> List[str]:
+        self._records.close()
+        if self._vectors is not None:
+            self._vectors.close()
+        for path in self.paths.values():
+            os.replace(self._partial(path), path)
+        return [str(path) for path in self.paths.values()]
+
+    def abort(self) -> None:
+        self._records.close()
+        if self._vectors is not None:
+            self._vectors._file.close()
+        for path in self.paths.values():
+            self._partial(path).unlink(missing_ok=True)
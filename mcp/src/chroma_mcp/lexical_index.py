@@ -0,0 +1,163 @@
+"""In-process BM25 inverted indexes over collection documents, for hybrid search."""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from chroma_mcp.singleflight import SingleFlight
+
+# Words, plus compounds such as product codes ("XR-200"), versions ("1.0.3") and paths
+_TOKEN = re.compile(r"\w+(?:[-.:/]\w+)*")
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased terms; a compound token also yields its parts so "XR-200" matches "xr 200"."""
+    terms = []
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group()
+        terms.append(token)
+        parts = _WORD.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index that supports upserts and deletes."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        # Distinct terms per document, so removal touches only its own posting lists
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    @classmethod
+    def from_documents(cls, ids: Iterable[str], documents: Iterable[Optional[str]]) -> "BM25Index":
+        index = cls()
+        index.upsert(ids, documents)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    @property
+    def num_terms(self) -> int:
+        return len(self._postings)
+
+    def upsert(self, ids: Iterable[str], documents: Iterable[Optional[str]]) -> None:
+        for doc_id, document in zip(ids, documents):
+            self._remove(doc_id)
+            terms = Counter(tokenize(document or ""))
+            for term, count in terms.items():
+                self._postings[term][doc_id] = count
+            self._doc_terms[doc_id] = tuple(terms)
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._total_length += length
+
+    def delete(self, ids: Iterable[str]) -> None:
+        for doc_id in ids:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id):
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top `k` (id, score) pairs for the query, best first."""
+        if not self._lengths:
+            return []
+        num_docs = len(self._lengths)
+        avg_length = self._total_length / num_docs or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, freq in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class LexicalIndexes:
+    """
+    One BM25 index per collection, built on first use from the collection's
+    documents and then kept current by the write tools. Writes that land while
+    an index is being built keep that build from being stored, so the next
+    query rebuilds instead of serving an index that missed them.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, BM25Index] = {}
+        self._writes: Dict[str, int] = defaultdict(int)
+        self._builds = SingleFlight()
+        self.builds = 0
+
+    async def get(
+        self,
+        collection_name: str,
+        load_documents: Callable[[], Awaitable[Tuple[List[str], List[Optional[str]]]]],
+        run: Callable[..., Awaitable[Any]],
+        rebuild: bool = False
+    ) -> BM25Index:
+        index = self._indexes.get(collection_name)
+        if index is not None and not rebuild:
+            return index
+        generation = self._writes[collection_name]
+
+        async def build() -> BM25Index:
+            ids, documents = await load_documents()
+            index = await run(BM25Index.from_documents, ids, documents)
+            self.builds += 1
+            if generation == self._writes[collection_name]:
+                self._indexes[collection_name] = index
+            return index
+
+        return await self._builds.do((collection_name, generation, rebuild), build)
+
+    def upsert(self, collection_name: str, ids: List[str], documents: List[Optional[str]]) -> None:
+        self._writes[collection_name] += 1
+        index = self._indexes.get(collection_name)
+        if index is not None:
+            index.upsert(ids, documents)
+
+    def delete(self, collection_name: str, ids: List[str]) -> None:
+        self._writes[collection_name] += 1
+        index = self._indexes.get(collection_name)
+        if index is not None:
+            index.delete(ids)
+
+    def drop(self, *collection_names: str) -> None:
+        for name in collection_names:
+            if name:
+                self._writes[name] += 1
+                self._indexes.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexes": len(self._indexes),
+            "documents": sum(len(index) for index in self._indexes.values()),
+            "terms": sum(index.num_terms for index in self._indexes.values()),
+            "builds": self.builds,
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        stats = self.stats()
+        return {
+            "lexical_index_documents": stats["documents"],
+            "lexical_index_terms": stats["terms"],
+        }
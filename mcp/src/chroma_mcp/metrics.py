@@ -0,0 +1,153 @@
+"""In-process metrics for the Chroma MCP server, exposed in Prometheus text format."""
+
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from an in-memory lookup up to a large ingest batch
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing is a bisect and two additions."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class ServerMetrics:
+    """
+    Latency histograms and counters keyed by (metric name, label value).
+    Tools run on the event loop, so updates need no locking. Gauges are read
+    from registered collectors only when the endpoint is scraped.
+    """
+
+    def __init__(self, prefix: str = "chroma_mcp", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.label_names: Dict[str, str] = {}
+        self.gauge_collectors: List[Callable[[], Dict[str, float]]] = []
+
+    def observe(self, name: str, seconds: float, label: str = "", label_name: str = "name") -> None:
+        histogram = self.histograms.get((name, label))
+        if histogram is None:
+            histogram = self.histograms[(name, label)] = Histogram(self.buckets)
+            self.label_names[name] = label_name
+        histogram.observe(seconds)
+
+    def increment(self, name: str, label: str = "", label_name: str = "name", amount: int = 1) -> None:
+        if name not in self.label_names:
+            self.label_names[name] = label_name
+        self.counters[(name, label)] += amount
+
+    @contextmanager
+    def timer(self, name: str, label: str = "", label_name: str = "name") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, label, label_name)
+
+    def add_gauge_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        self.gauge_collectors.append(collector)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        histograms: Dict[str, list] = {}
+        for (name, label), histogram in sorted(list(self.histograms.items())):
+            histograms.setdefault(name, []).append((label, histogram))
+        for name, series in histograms.items():
+            metric = f"{self.prefix}_{name}_seconds"
+            label_name = self.label_names.get(name, "name")
+            family(metric, "histogram", f"{name.replace('_', ' ').capitalize()} latency in seconds")
+            for label, histogram in series:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_labels({label_name: label, 'le': _number(bound)})} {cumulative}")
+                lines.append(f"{metric}_sum{_labels({label_name: label})} {_number(histogram.sum)}")
+                lines.append(f"{metric}_count{_labels({label_name: label})} {histogram.count}")
+
+        counters: Dict[str, list] = {}
+        for (name, label), value in sorted(list(self.counters.items())):
+            counters.setdefault(name, []).append((label, value))
+        for name, series in counters.items():
+            metric = f"{self.prefix}_{name}_total"
+            label_name = self.label_names.get(name, "name")
+            family(metric, "counter", f"Total {name.replace('_', ' ')}")
+            for label, value in series:
+                lines.append(f"{metric}{_labels({label_name: label})} {value}")
+
+        gauges: Dict[str, float] = {}
+        for collector in self.gauge_collectors:
+            gauges.update(collector())
+        for name, value in sorted(gauges.items()):
+            metric = f"{self.prefix}_{name}"
+            family(metric, "gauge", name.replace("_", " ").capitalize())
+            lines.append(f"{metric} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+class EventLoopLagMonitor:
+    """Records how late the event loop wakes a sleeping task, i.e. how long it was blocked."""
+
+    def __init__(self, metrics: ServerMetrics, interval_seconds: float = 0.5):
+        self.metrics = metrics
+        self.interval_seconds = interval_seconds
+        self.last_lag_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+        metrics.add_gauge_collector(lambda: {"event_loop_lag_last_seconds": self.last_lag_seconds})
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="event-loop-lag")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.last_lag_seconds = max(0.0, loop.time() - scheduled)
+            self.metrics.observe("event_loop_lag", self.last_lag_seconds)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in labels.items() if value != ""]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
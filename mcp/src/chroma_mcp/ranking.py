@@ -0,0 +1,93 @@
+"""Merging and fusing ranked Chroma query results."""
+
+import heapq
+from itertools import islice
+
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+# Per-hit fields of a Chroma QueryResult, besides ids and distances
+HIT_FIELDS = ("documents", "metadatas", "embeddings", "uris", "data")
+
+
+def merge_by_distance(results: Dict[str, Dict[str, Any]], n_results: int) -> Dict[str, List[List[Any]]]:
+    """
+    Merge per-collection query results into one top-`n_results` ranking per
+    query text. Each collection's hits are already sorted by ascending
+    distance, so a heap merge of the streams yields the global order without
+    sorting everything; ties keep collection order, then rank.
+
+    Returns a QueryResult-shaped dict with an extra `collections` list naming
+    the source collection of each hit.
+    """
+    names = list(results)
+    num_queries = len(results[names[0]]["ids"]) if names else 0
+    fields = [field for field in HIT_FIELDS if any(results[name].get(field) is not None for name in names)]
+    merged: Dict[str, List[List[Any]]] = {key: [] for key in ("ids", "distances", "collections", *fields)}
+
+    for query_index in range(num_queries):
+        streams = [_ranked_hits(results[name]["distances"][query_index], source) for source, name in enumerate(names)]
+        top = list(islice(heapq.merge(*streams), n_results))
+        merged["ids"].append([results[names[source]]["ids"][query_index][rank] for _, source, rank in top])
+        merged["distances"].append([distance for distance, _, _ in top])
+        merged["collections"].append([names[source] for _, source, _ in top])
+        for field in fields:
+            merged[field].append([
+                _hit_value(results[names[source]].get(field), query_index, rank) for _, source, rank in top
+            ])
+    return merged
+
+
+def _ranked_hits(distances: List[float], source: int):
+    for rank, distance in enumerate(distances):
+        yield distance, source, rank
+
+
+def _hit_value(values: Any, query_index: int, rank: int) -> Any:
+    if values is None:
+        return None
+    return values[query_index][rank]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]], weights: List[float], n_results: int, k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists with weighted reciprocal rank fusion: each list adds
+    `weight / (k + rank)` to the ids it contains (rank starting at 1). Only
+    ranks are used, so scores on different scales (BM25, cosine distance) need
+    no normalization. Returns the top `n_results` (id, score) pairs, best first.
+    """
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return heapq.nlargest(n_results, scores.items(), key=lambda entry: entry[1])
+
+
+def mmr_select(query_embedding: Any, candidate_embeddings: Any, k: int, lambda_mult: float) -> List[int]:
+    """
+    Maximal marginal relevance: greedily pick `k` candidate indices, each time
+    maximizing `lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, picked)`
+    with cosine similarity. Similarities are computed once as matrix products;
+    each step only updates the running max-similarity vector.
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if candidates.size == 0 or k <= 0:
+        return []
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected: List[int] = []
+    for _ in range(min(k, len(candidates))):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        redundancy = np.maximum(redundancy, similarity[pick])
+    return selected
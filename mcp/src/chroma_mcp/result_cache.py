@@ -0,0 +1,119 @@
+"""In-process cache of chroma_query_documents results, invalidated per collection on writes."""
+
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+
+def _json_default(value: Any) -> Any:
+    # numpy arrays show up when embeddings are included
+    return value.tolist() if hasattr(value, "tolist") else str(value)
+
+
+def canonical_key(**arguments: Any) -> str:
+    """Order-independent serialization of the tool arguments."""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=_json_default)
+
+
+class QueryResultCache:
+    """
+    LRU + TTL cache of query results keyed on (collection, canonical arguments).
+    Each collection has a generation that writes bump; a result computed under
+    an older generation is never stored, so a query racing a write cannot
+    repopulate stale data. `max_entries` of 0 disables the cache.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def configure(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._evict()
+
+    def generation(self, collection_name: str) -> int:
+        return self._generations[collection_name]
+
+    def get(self, collection_name: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get((collection_name, key))
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            self._remove((collection_name, key))
+            self.misses += 1
+            return None
+        self._entries.move_to_end((collection_name, key))
+        self.hits += 1
+        return value
+
+    def put(self, collection_name: str, key: str, value: Any, generation: int) -> None:
+        if not self.enabled or generation != self._generations[collection_name]:
+            return
+        self._remove((collection_name, key))
+        size = len(json.dumps(value, default=_json_default))
+        self._entries[(collection_name, key)] = (time.monotonic() + self.ttl_seconds, size, value)
+        self.bytes += size
+        self._evict()
+
+    def invalidate(self, collection_name: str) -> None:
+        """Drop a collection's results and reject results computed before now."""
+        self._generations[collection_name] += 1
+        stale = [entry_key for entry_key in self._entries if entry_key[0] == collection_name]
+        for entry_key in stale:
+            self._remove(entry_key)
+        self.invalidations += 1
+
+    def _remove(self, entry_key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "approx_bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        stats = self.stats()
+        return {
+            "query_result_cache_entries": stats["entries"],
+            "query_result_cache_bytes": stats["approx_bytes"],
+            "query_result_cache_hit_ratio": stats["hit_ratio"],
+        }
@@ -1,7 +1,9 @@
 from typing import Dict, List, TypedDict, Union
 from enum import Enum
 import chromadb
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
 import os
 from dotenv import load_dotenv
 import argparse
@@ -10,6 +12,8 @@ import ssl
 import uuid
 import time
 import json
+import asyncio
+import fnmatch
 from typing_extensions import TypedDict
 
 
@@ -26,11 +30,78 @@ from chromadb.utils.embedding_functions import (
     RoboflowEmbeddingFunction,
 )
 
-# Initialize FastMCP server
-mcp = FastMCP("chroma")
+from chroma_mcp.collection_cache import CollectionHandleCache
+from chroma_mcp.cursors import IdSnapshots, decode_cursor, encode_cursor, filter_key
+from chroma_mcp.concurrency import ToolExecutor, parse_tool_limits
+from chroma_mcp.embedders import EmbedderRegistry
+from chroma_mcp.export import EXPORT_FORMATS, CollectionExportWriter, resolve_export_path
+from chroma_mcp.embedding_cache import QueryEmbeddingCache, embed_queries
+from chroma_mcp.lexical_index import LexicalIndexes
+from chroma_mcp.metrics import PROMETHEUS_CONTENT_TYPE, EventLoopLagMonitor, ServerMetrics
+from chroma_mcp.ranking import HIT_FIELDS, merge_by_distance, mmr_select, reciprocal_rank_fusion
+from chroma_mcp.result_cache import QueryResultCache, canonical_key
+from chroma_mcp.singleflight import SingleFlight
+from chroma_mcp.vectors import decode_embeddings, encode_embeddings
+
+# Hybrid search fuses this many candidates per ranking for each requested result
+_HYBRID_CANDIDATE_FACTOR = 4
+_LEXICAL_INDEX_PAGE_SIZE = 1000
+_EXPORT_PAGE_SIZE = 1000
 
 # Global variables
 _chroma_client = None
+_metrics = ServerMetrics()
+_loop_monitor = EventLoopLagMonitor(_metrics)
+_executor = ToolExecutor()
+_metrics.add_gauge_collector(_executor.stats)
+_query_embedding_cache = QueryEmbeddingCache()
+_metrics.add_gauge_collector(_query_embedding_cache.gauges)
+_query_result_cache = QueryResultCache()
+# Part of every collection version token, so tokens from before a restart never match
+_server_epoch = uuid.uuid4().hex[:8]
+_metrics.add_gauge_collector(_query_result_cache.gauges)
+_query_flights = SingleFlight()
+_metrics.add_gauge_collector(_query_flights.gauges)
+_collection_cache = CollectionHandleCache()
+_metrics.add_gauge_collector(_collection_cache.gauges)
+_lexical_indexes = LexicalIndexes()
+_metrics.add_gauge_collector(_lexical_indexes.gauges)
+_export_dir = os.getenv('CHROMA_MCP_EXPORT_DIR', 'exports')
+_id_snapshots = IdSnapshots(os.path.join(_export_dir, '.id-snapshots'))
+_metrics.add_gauge_collector(_id_snapshots.gauges)
+
+
+class InstrumentedFastMCP(FastMCP):
+    """FastMCP server that records request and per-tool latency and call counts."""
+
+    async def list_tools(self):
+        with _metrics.timer("request", "tools/list", label_name="method"):
+            return await super().list_tools()
+
+    async def call_tool(self, name: str, arguments: dict):
+        _metrics.increment("tool_calls", name, label_name="tool")
+        with _metrics.timer("request", "tools/call", label_name="method"):
+            async with _executor.slot(name):
+                with _metrics.timer("tool_call", name, label_name="tool"):
+                    try:
+                        return await super().call_tool(name, arguments)
+                    except Exception:
+                        _metrics.increment("tool_errors", name, label_name="tool")
+                        raise
+
+    async def run_sse_async(self, mount_path: str | None = None) -> None:
+        _loop_monitor.start()
+        await super().run_sse_async(mount_path)
+
+
+# Initialize FastMCP server
+mcp = InstrumentedFastMCP("chroma")
+
+
+@mcp.custom_route("/metrics/prometheus", methods=["GET"])
+async def prometheus_metrics(request: Request) -> Response:
+    """Expose server metrics in the Prometheus text exposition format."""
+    return Response(_metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 def create_parser():
     """Create and return the argument parser."""
@@ -78,6 +149,56 @@ def create_parser():
     parser.add_argument('--dotenv-path', 
                        help='Path to .env file', 
                        default=os.getenv('CHROMA_DOTENV_PATH', '.chroma_env'))
+    
+    # Concurrency options
+    parser.add_argument('--executor-workers',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_EXECUTOR_WORKERS', '16')),
+                       help='Threads used to run blocking Chroma calls (default: 16)')
+    parser.add_argument('--tool-concurrency',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_TOOL_CONCURRENCY', '8')),
+                       help='Maximum concurrent calls per tool (default: 8)')
+    parser.add_argument('--tool-concurrency-limits',
+                       help='Per-tool overrides, e.g. "chroma_add_documents=2,chroma_query_documents=16"',
+                       default=os.getenv('CHROMA_MCP_TOOL_CONCURRENCY_LIMITS'))
+    
+    # Cache options
+    parser.add_argument('--query-embedding-cache-mb',
+                       type=float,
+                       default=float(os.getenv('CHROMA_MCP_QUERY_EMBEDDING_CACHE_MB', '64')),
+                       help='Memory budget for cached query embeddings in MB, 0 disables (default: 64)')
+    parser.add_argument('--query-result-cache-size',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_QUERY_RESULT_CACHE_SIZE', '1024')),
+                       help='Maximum cached chroma_query_documents results, 0 disables (default: 1024)')
+    parser.add_argument('--query-result-cache-ttl',
+                       type=float,
+                       default=float(os.getenv('CHROMA_MCP_QUERY_RESULT_CACHE_TTL', '300')),
+                       help='Seconds a cached query result stays valid (default: 300)')
+    parser.add_argument('--collection-cache-ttl',
+                       type=float,
+                       default=float(os.getenv('CHROMA_MCP_COLLECTION_CACHE_TTL', '60')),
+                       help='Seconds a cached collection handle stays valid, 0 disables (default: 60)')
+    parser.add_argument('--export-dir',
+                       default=os.getenv('CHROMA_MCP_EXPORT_DIR', 'exports'),
+                       help='Directory chroma_export_collection writes to (default: ./exports)')
+    parser.add_argument('--iter-max-ids',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_ITER_MAX_IDS', '0')),
+                       help='Optional guard: refuse chroma_iter_documents/chroma_export_collection snapshots of more IDs, 0 disables (default: 0)')
+    parser.add_argument('--embed-workers',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_EMBED_WORKERS', '1')),
+                       help='Threads running batched embedding inference (default: 1)')
+    parser.add_argument('--embed-batch-size',
+                       type=int,
+                       default=int(os.getenv('CHROMA_MCP_EMBED_BATCH_SIZE', '64')),
+                       help='Texts that trigger an embedding batch right away (default: 64)')
+    parser.add_argument('--embed-batch-wait-ms',
+                       type=float,
+                       default=float(os.getenv('CHROMA_MCP_EMBED_BATCH_WAIT_MS', '5')),
+                       help='Longest an embedding request waits for others to batch with, 0 disables batching (default: 5)')
     return parser
 
 def get_chroma_client(args=None):
@@ -152,6 +273,37 @@ def get_chroma_client(args=None):
             
     return _chroma_client
 
+async def _get_collection(collection_name: str, create: bool = False):
+    """Get a collection handle, served from the handle cache when possible."""
+    client = get_chroma_client()
+    load = client.get_or_create_collection if create else client.get_collection
+    return await _collection_cache.get(client, collection_name, lambda: _executor.run(load, collection_name))
+
+async def _embedding_function(collection):
+    """The collection's embedding function, resolved from its stored configuration; None if it has none."""
+    return await _embedders.for_configuration(
+        collection.configuration_json, lambda: collection.configuration.get("embedding_function")
+    )
+
+async def _embed_texts(collection, texts: List[str]) -> List | None:
+    """
+    Embed texts with the collection's embedding function, batched with other in-flight
+    requests; None when the server cannot resolve the function and Chroma should embed.
+    """
+    embedding_function = await _embedding_function(collection)
+    if embedding_function is None:
+        return None
+    return await _embedders.embed(embedding_function, texts)
+
+async def _write(collection_names: List[str], fn, *args, **kwargs):
+    """Run a blocking write and invalidate cached results for the collections it touches."""
+    try:
+        return await _executor.run(fn, *args, **kwargs)
+    finally:
+        for name in collection_names:
+            if name:
+                _query_result_cache.invalidate(name)
+
 ##### Collection Tools #####
 
 @mcp.tool()
@@ -170,7 +322,7 @@ async def chroma_list_collections(
     """
     client = get_chroma_client()
     try:
-        colls = client.list_collections(limit=limit, offset=offset)
+        colls = await _executor.run(client.list_collections, limit=limit, offset=offset)
         # Safe handling: If colls is None or empty, return a special marker
         if not colls:
             return ["__NO_COLLECTIONS_FOUND__"]
@@ -188,6 +340,11 @@ mcp_known_embedding_functions: Dict[str, EmbeddingFunction] = {
     "voyageai": VoyageAIEmbeddingFunction,
     "roboflow": RoboflowEmbeddingFunction,
 }
+# One instance per embedding function per process, shared by every tool that embeds.
+# Batches run on their own worker so inference neither waits behind nor starves Chroma calls
+_embedding_worker = ToolExecutor(max_workers=1)
+_embedders = EmbedderRegistry(mcp_known_embedding_functions, _embedding_worker.run)
+_metrics.add_gauge_collector(_embedders.gauges)
 
 @mcp.tool()
 async def chroma_create_collection(
@@ -221,7 +378,7 @@ async def chroma_create_collection(
     client = get_chroma_client()
         
     
-    embedding_function = mcp_known_embedding_functions[embedding_function_name]
+    embedding_function = await _embedders.get(embedding_function_name)
     
     hnsw_config = CreateHNSWConfiguration()
     if space:
@@ -245,15 +402,18 @@ async def chroma_create_collection(
     
     configuration=CreateCollectionConfiguration(
         hnsw=hnsw_config,
-        embedding_function=embedding_function()
+        embedding_function=embedding_function
     )
     
     try:
-        client.create_collection(
+        await _executor.run(
+            client.create_collection,
             name=collection_name,
             configuration=configuration,
             metadata=metadata
         )
+        _collection_cache.invalidate(collection_name)
+        _lexical_indexes.drop(collection_name)
         config_msg = f" with configuration: {configuration}"
         return f"Successfully created collection {collection_name}{config_msg}"
     except Exception as e:
@@ -270,10 +430,9 @@ async def chroma_peek_collection(
         collection_name: Name of the collection to peek into
         limit: Number of documents to peek at
     """
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
-        results = collection.peek(limit=limit)
+        collection = await _get_collection(collection_name)
+        results = await _executor.run(collection.peek, limit=limit)
         return results
     except Exception as e:
         raise Exception(f"Failed to peek collection '{collection_name}': {str(e)}") from e
@@ -285,15 +444,14 @@ async def chroma_get_collection_info(collection_name: str) -> Dict:
     Args:
         collection_name: Name of the collection to get info about
     """
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
+        collection = await _get_collection(collection_name)
         
         # Get collection count
-        count = collection.count()
+        count = await _executor.run(collection.count)
         
         # Peek at a few documents
-        peek_results = collection.peek(limit=3)
+        peek_results = await _executor.run(collection.peek, limit=3)
         
         return {
             "name": collection_name,
@@ -310,10 +468,9 @@ async def chroma_get_collection_count(collection_name: str) -> int:
     Args:
         collection_name: Name of the collection to count
     """
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
-        return collection.count()
+        collection = await _get_collection(collection_name)
+        return await _executor.run(collection.count)
     except Exception as e:
         raise Exception(f"Failed to get collection count for '{collection_name}': {str(e)}") from e
 
@@ -340,9 +497,8 @@ async def chroma_modify_collection(
         sync_threshold: Number of elements to process before syncing index to disk
         resize_factor: Factor to resize the index by when it's full
     """
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
+        collection = await _get_collection(collection_name)
         
         hnsw_config = UpdateHNSWConfiguration()
         if ef_search:
@@ -359,7 +515,15 @@ async def chroma_modify_collection(
         configuration = UpdateCollectionConfiguration(
             hnsw=hnsw_config
         )
-        collection.modify(name=new_name, configuration=configuration, metadata=new_metadata)
+        try:
+            await _write(
+                [collection_name, new_name], collection.modify,
+                name=new_name, configuration=configuration, metadata=new_metadata
+            )
+        finally:
+            # The cached handle is renamed in place, so neither name can keep it
+            _collection_cache.invalidate(collection_name, new_name)
+            _lexical_indexes.drop(collection_name, new_name)
         
         modified_aspects = []
         if new_name:
@@ -382,7 +546,11 @@ async def chroma_delete_collection(collection_name: str) -> str:
     """
     client = get_chroma_client()
     try:
-        client.delete_collection(collection_name)
+        try:
+            await _write([collection_name], client.delete_collection, collection_name)
+        finally:
+            _collection_cache.invalidate(collection_name)
+            _lexical_indexes.drop(collection_name)
         return f"Successfully deleted collection {collection_name}"
     except Exception as e:
         raise Exception(f"Failed to delete collection '{collection_name}': {str(e)}") from e
@@ -416,12 +584,12 @@ async def chroma_add_documents(
     if len(ids) != len(documents):
         raise ValueError(f"Number of ids ({len(ids)}) must match number of documents ({len(documents)}).")
 
-    client = get_chroma_client()
     try:
-        collection = client.get_or_create_collection(collection_name)
+        collection = await _get_collection(collection_name, create=True)
         
-        # Check for duplicate IDs
-        existing_ids = collection.get(include=[])["ids"]
+        # Check for duplicate IDs, looking up only this batch's IDs so the cost
+        # scales with the batch rather than the collection
+        existing_ids = set((await _executor.run(collection.get, ids=ids, include=[]))["ids"])
         duplicate_ids = [id for id in ids if id in existing_ids]
         
         if duplicate_ids:
@@ -430,11 +598,16 @@ async def chroma_add_documents(
                 f"Use 'chroma_update_documents' to update existing documents."
             )
         
-        result = collection.add(
+        embeddings = await _embed_texts(collection, documents)
+        result = await _write(
+            [collection_name],
+            collection.add,
             documents=documents,
             metadatas=metadatas,
-            ids=ids
+            ids=ids,
+            embeddings=embeddings
         )
+        _lexical_indexes.upsert(collection_name, ids, documents)
         
         # Check the return value
         if result and isinstance(result, dict):
@@ -451,6 +624,110 @@ async def chroma_add_documents(
     except Exception as e:
         raise Exception(f"Failed to add documents to collection '{collection_name}': {str(e)}") from e
 
+async def _report_progress(ctx: Context, progress: float, total: float, message: str) -> None:
+    """Send a progress notification if the caller asked for them."""
+    try:
+        await ctx.report_progress(progress, total, message)
+    except ValueError:
+        # Called outside an MCP request, e.g. directly from tests
+        pass
+
+@mcp.tool()
+async def chroma_bulk_add_documents(
+    collection_name: str,
+    documents: List[str],
+    ids: List[str],
+    ctx: Context,
+    metadatas: List[Dict] | None = None,
+    batch_size: int | None = None
+) -> Dict:
+    """Add a large number of documents to a Chroma collection in batches.
+    
+    Documents are split into batches no larger than the server's maximum batch size.
+    The next batch is embedded while the current one is written, and progress is
+    reported after every batch. A failed batch does not stop the remaining batches.
+    
+    Args:
+        collection_name: Name of the collection to add documents to
+        documents: List of text documents to add
+        ids: List of IDs for the documents (required, unique)
+        metadatas: Optional list of metadata dictionaries for each document
+        batch_size: Optional batch size, capped at the server's maximum batch size
+    
+    Returns:
+        Summary with the number of documents added and failed, and a status for each batch
+    """
+    if not documents:
+        raise ValueError("The 'documents' list cannot be empty.")
+    if not ids:
+        raise ValueError("The 'ids' list is required and cannot be empty.")
+    if any(not id.strip() for id in ids):
+        raise ValueError("IDs cannot be empty strings.")
+    if len(ids) != len(documents):
+        raise ValueError(f"Number of ids ({len(ids)}) must match number of documents ({len(documents)}).")
+    if metadatas is not None and len(metadatas) != len(ids):
+        raise ValueError("Length of 'metadatas' list must match length of 'ids' list.")
+    if len(set(ids)) != len(ids):
+        raise ValueError("IDs must be unique within the request.")
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    client = get_chroma_client()
+    try:
+        collection = await _get_collection(collection_name, create=True)
+        max_batch_size = await _executor.run(client.get_max_batch_size)
+    except Exception as e:
+        raise Exception(f"Failed to prepare bulk add to collection '{collection_name}': {str(e)}") from e
+
+    size = min(batch_size or max_batch_size, max_batch_size)
+    bounds = [(start, min(start + size, len(ids))) for start in range(0, len(ids), size)]
+
+    def embed(start: int, end: int) -> "asyncio.Future":
+        # Computed here rather than inside collection.add so it can overlap the previous write
+        return asyncio.ensure_future(_embed_texts(collection, documents[start:end]))
+
+    batches = []
+    added = 0
+    next_embeddings = embed(*bounds[0])
+    for index, (start, end) in enumerate(bounds):
+        embeddings = next_embeddings
+        if index + 1 < len(bounds):
+            next_embeddings = embed(*bounds[index + 1])
+        batch = {"batch": index, "start": start, "end": end}
+        try:
+            batch_embeddings = await embeddings
+            batch_ids = ids[start:end]
+            existing = (await _executor.run(collection.get, ids=batch_ids, include=[]))["ids"]
+            if existing:
+                raise ValueError(f"IDs already exist: {existing}")
+            await _write(
+                [collection_name],
+                collection.add,
+                ids=batch_ids,
+                documents=documents[start:end],
+                metadatas=metadatas[start:end] if metadatas is not None else None,
+                embeddings=batch_embeddings
+            )
+            _lexical_indexes.upsert(collection_name, batch_ids, documents[start:end])
+            batch["status"] = "succeeded"
+            added += end - start
+        except Exception as e:
+            batch["status"] = "failed"
+            batch["error"] = str(e)
+        batches.append(batch)
+        await _report_progress(
+            ctx, end, len(ids), f"Batch {index + 1}/{len(bounds)} {batch['status']}"
+        )
+
+    return {
+        "collection_name": collection_name,
+        "total_documents": len(ids),
+        "batch_size": size,
+        "added": added,
+        "failed": len(ids) - added,
+        "batches": batches,
+    }
+
 @mcp.tool()
 async def chroma_query_documents(
     collection_name: str,
@@ -478,11 +755,157 @@ async def chroma_query_documents(
     if not query_texts:
         raise ValueError("The 'query_texts' list cannot be empty.")
 
-    client = get_chroma_client()
+    return await _query_collection(collection_name, query_texts, n_results, where, where_document, include)
+
+async def _query_collection(
+    collection_name: str,
+    query_texts: List[str],
+    n_results: int,
+    where: Dict | None,
+    where_document: Dict | None,
+    include: List[str]
+) -> Dict:
+    """Query one collection through the result cache and in-flight coalescing."""
+    cache_key = canonical_key(
+        query_texts=query_texts, n_results=n_results, where=where,
+        where_document=where_document, include=include
+    )
+    cached = _query_result_cache.get(collection_name, cache_key)
+    if cached is not None:
+        return cached
+    # Taken before querying so a write that lands meanwhile keeps this result out of the cache
+    generation = _query_result_cache.generation(collection_name)
+
+    async def run_query():
+        try:
+            collection = await _get_collection(collection_name)
+            query_input = {"query_texts": query_texts}
+            if await _embedding_function(collection) is not None:
+                # Embedded here so repeated queries hit the cache and concurrent ones share a batch
+                query_input = {"query_embeddings": await _embed_query_texts(collection, query_texts)}
+            result = await _executor.run(
+                collection.query,
+                **query_input,
+                n_results=n_results,
+                where=where,
+                where_document=where_document,
+                include=include
+            )
+        except Exception as e:
+            raise Exception(f"Failed to query documents from collection '{collection_name}': {str(e)}") from e
+        _query_result_cache.put(collection_name, cache_key, result, generation)
+        return result
+
+    # Identical concurrent queries share one Chroma call; the generation keeps
+    # a query issued after a write from joining one that started before it
+    return await _query_flights.do((collection_name, generation, cache_key), run_query)
+
+async def _embed_query_texts(collection, query_texts: List[str]) -> List:
+    """Embed query texts with the collection's embedding function, through the query-embedding cache."""
+    embedding_function = await _embedding_function(collection)
+    if embedding_function is None:
+        raise ValueError(f"Collection '{collection.name}' has no embedding function the server can use.")
+    if _query_embedding_cache.enabled:
+        return await embed_queries(_query_embedding_cache, embedding_function, query_texts, _embedders.embed)
+    return await _embedders.embed(embedding_function, query_texts)
+
+@mcp.tool()
+async def chroma_query_mmr(
+    collection_name: str,
+    query_texts: List[str],
+    n_results: int = 5,
+    fetch_k: int = 20,
+    lambda_mult: float = 0.5,
+    where: Dict | None = None,
+    where_document: Dict | None = None,
+    include: List[str] = ["documents", "metadatas", "distances"]
+) -> Dict:
+    """Query a Chroma collection and return relevant but diverse results (maximal marginal relevance).
+    
+    Fetches `fetch_k` candidates by similarity, then picks `n_results` of them one at a time,
+    trading relevance to the query against similarity to the results already picked. Use it
+    instead of chroma_query_documents when overlapping chunks crowd out other content.
+    
+    Args:
+        collection_name: Name of the collection to query
+        query_texts: List of query texts to search for
+        n_results: Number of results to return per query
+        fetch_k: Number of candidates to fetch per query before reranking; at least n_results
+        lambda_mult: Between 0 and 1; 1 ranks by relevance only, 0 maximizes diversity
+        where: Optional metadata filters using Chroma's query operators
+        where_document: Optional document content filters
+        include: List of what to include in response. By default, this will include documents, metadatas, and distances.
+    """
+    if not query_texts:
+        raise ValueError("The 'query_texts' list cannot be empty.")
+    if not 0 <= lambda_mult <= 1:
+        raise ValueError("lambda_mult must be between 0 and 1.")
+    if fetch_k < n_results:
+        raise ValueError("fetch_k must be at least n_results.")
+
     try:
-        collection = client.get_collection(collection_name)
-        return collection.query(
-            query_texts=query_texts,
+        collection = await _get_collection(collection_name)
+        query_embeddings = await _embed_query_texts(collection, query_texts)
+        candidates = await _executor.run(
+            collection.query,
+            query_embeddings=query_embeddings,
+            n_results=fetch_k,
+            where=where,
+            where_document=where_document,
+            include=list(dict.fromkeys([*include, "embeddings"]))
+        )
+    except Exception as e:
+        raise Exception(f"Failed to query documents from collection '{collection_name}': {str(e)}") from e
+
+    fields = [field for field in ("distances", *HIT_FIELDS) if field in include and candidates.get(field) is not None]
+    result = {"ids": [], **{field: [] for field in fields}}
+    for query_index, query_embedding in enumerate(query_embeddings):
+        picks = mmr_select(query_embedding, candidates["embeddings"][query_index], n_results, lambda_mult)
+        result["ids"].append([candidates["ids"][query_index][pick] for pick in picks])
+        for field in fields:
+            result[field].append([candidates[field][query_index][pick] for pick in picks])
+    return result
+
+async def _collection_dimension(collection) -> int | None:
+    """The collection's embedding dimension, read from one stored vector, or None while it is empty."""
+    sample = await _executor.run(collection.get, include=["embeddings"], limit=1)
+    if sample["embeddings"] is not None and len(sample["embeddings"]):
+        return len(sample["embeddings"][0])
+    return None
+
+@mcp.tool()
+async def chroma_query_by_embedding(
+    collection_name: str,
+    query_embeddings: List[List[float]] | str,
+    n_results: int = 5,
+    where: Dict | None = None,
+    where_document: Dict | None = None,
+    include: List[str] = ["documents", "metadatas", "distances"]
+) -> Dict:
+    """Query a Chroma collection with precomputed query vectors, skipping server-side embedding.
+    
+    The vectors must come from the same embedding model as the collection's documents.
+    
+    Args:
+        collection_name: Name of the collection to query
+        query_embeddings: Query vectors, either a list of float lists or a base64 string of
+                          packed little-endian float32 values (queries concatenated back to back)
+        n_results: Number of results to return per query
+        where: Optional metadata filters using Chroma's query operators
+        where_document: Optional document content filters
+        include: List of what to include in response. By default, this will include documents, metadatas, and distances.
+    """
+    try:
+        collection = await _get_collection(collection_name)
+        dimension = await _collection_dimension(collection)
+    except Exception as e:
+        raise Exception(f"Failed to get collection '{collection_name}': {str(e)}") from e
+    vectors = decode_embeddings(query_embeddings, dimension)
+
+    try:
+        return await _executor.run(
+            collection.query,
+            query_embeddings=vectors,
             n_results=n_results,
             where=where,
             where_document=where_document,
@@ -491,6 +914,73 @@ async def chroma_query_documents(
     except Exception as e:
         raise Exception(f"Failed to query documents from collection '{collection_name}': {str(e)}") from e
 
+def _is_glob(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+async def _resolve_collection_names(patterns: List[str]) -> List[str]:
+    """Expand glob patterns against the existing collections, keeping plain names as given."""
+    if not any(_is_glob(pattern) for pattern in patterns):
+        return list(dict.fromkeys(patterns))
+    client = get_chroma_client()
+    existing = [coll.name for coll in await _executor.run(client.list_collections)]
+    names = []
+    for pattern in patterns:
+        if _is_glob(pattern):
+            names.extend(sorted(fnmatch.filter(existing, pattern)))
+        else:
+            names.append(pattern)
+    return list(dict.fromkeys(names))
+
+@mcp.tool()
+async def chroma_query_many(
+    collection_names: List[str],
+    query_texts: List[str],
+    n_results: int = 5,
+    where: Dict | None = None,
+    where_document: Dict | None = None,
+    include: List[str] = ["documents", "metadatas", "distances"]
+) -> Dict:
+    """Query several Chroma collections concurrently and merge the hits into one ranking.
+    
+    Args:
+        collection_names: Collection names or glob patterns (e.g. "docs_2024_*") to query
+        query_texts: List of query texts to search for
+        n_results: Number of merged results to return per query
+        where: Optional metadata filters using Chroma's query operators, applied to every collection
+        where_document: Optional document content filters, applied to every collection
+        include: List of what to include in response. By default, this will include documents, metadatas, and distances.
+    
+    Returns:
+        The merged results ordered by distance, with a `collections` list giving each hit's
+        source collection and an `errors` map for collections that could not be queried.
+        Distances are only comparable across collections that share an embedding function
+        and distance space.
+    """
+    if not collection_names:
+        raise ValueError("The 'collection_names' list cannot be empty.")
+    if not query_texts:
+        raise ValueError("The 'query_texts' list cannot be empty.")
+
+    names = await _resolve_collection_names(collection_names)
+    if not names:
+        raise ValueError(f"No collections match {collection_names}")
+    # Merging needs distances even when the caller did not ask for them
+    query_include = list(dict.fromkeys([*include, "distances"]))
+    outcomes = await asyncio.gather(
+        *[_query_collection(name, query_texts, n_results, where, where_document, query_include) for name in names],
+        return_exceptions=True
+    )
+    results = {name: outcome for name, outcome in zip(names, outcomes) if not isinstance(outcome, BaseException)}
+    errors = {name: str(outcome) for name, outcome in zip(names, outcomes) if isinstance(outcome, BaseException)}
+    if not results:
+        raise Exception(f"Failed to query collections {names}: {errors}")
+
+    merged = merge_by_distance(results, n_results)
+    if "distances" not in include:
+        del merged["distances"]
+    merged["errors"] = errors
+    return merged
+
 @mcp.tool()
 async def chroma_get_documents(
     collection_name: str,
@@ -520,10 +1010,10 @@ async def chroma_get_documents(
     Returns:
         Dictionary containing the matching documents, their IDs, and requested includes
     """
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
-        return collection.get(
+        collection = await _get_collection(collection_name)
+        return await _executor.run(
+            collection.get,
             ids=ids,
             where=where,
             where_document=where_document,
@@ -534,6 +1024,147 @@ async def chroma_get_documents(
     except Exception as e:
         raise Exception(f"Failed to get documents from collection '{collection_name}': {str(e)}") from e
 
+async def _snapshot_ids(collection, where: Dict | None, where_document: Dict | None):
+    """Spill the ids matching the filters to a sorted snapshot file, a bounded page at a time."""
+    async def fetch_page(offset: int, limit: int) -> List[str]:
+        page = await _executor.run(
+            collection.get, where=where, where_document=where_document, include=[], limit=limit, offset=offset
+        )
+        return page["ids"]
+
+    return await _id_snapshots.create(fetch_page, _executor.run)
+
+async def _get_in_id_order(collection, ids: List[str], include: List[str], **filters) -> Dict[str, List]:
+    """Fetch `ids` by ID, dropping any deleted since, in the order given."""
+    if not ids:
+        return {"ids": [], **{field: [] for field in include}}
+    records = await _executor.run(collection.get, ids=ids, include=include, **filters)
+    rows = {doc_id: row for row, doc_id in enumerate(records["ids"])}
+    ordered = [rows[doc_id] for doc_id in ids if doc_id in rows]
+    page: Dict[str, List] = {"ids": [records["ids"][row] for row in ordered]}
+    for field in include:
+        values = records.get(field)
+        page[field] = [values[row] if values is not None else None for row in ordered]
+    return page
+
+@mcp.tool()
+async def chroma_iter_documents(
+    collection_name: str,
+    cursor: str | None = None,
+    page_size: int = 100,
+    where: Dict | None = None,
+    where_document: Dict | None = None,
+    include: List[str] = ["documents", "metadatas"]
+) -> Dict:
+    """Page through all documents of a Chroma collection in ID order.
+    
+    The first page reads the IDs matching the filters once, in bounded pages, into a sorted
+    snapshot file under the export directory; every later page is located in that file and
+    fetched by ID, so it costs the same however deep it is and memory does not grow with the
+    collection. Documents deleted while iterating are skipped, and documents added after the
+    first page are not returned, so a page may come back shorter than page_size. The
+    snapshot is deleted once the iteration goes idle; an expired cursor resumes after its
+    last ID from a fresh one.
+    
+    Args:
+        collection_name: Name of the collection to iterate
+        cursor: Cursor from the previous page's `next_cursor`; omit for the first page
+        page_size: Number of documents per page
+        where: Optional metadata filters using Chroma's query operators; must be the same on every page
+        where_document: Optional document content filters; must be the same on every page
+        include: List of what to include in response. By default, this will include documents, and metadatas.
+    
+    Returns:
+        The page's ids and requested includes, sorted by ID, and `next_cursor`, which is
+        null once the collection is exhausted
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer.")
+    filters = filter_key(where, where_document)
+    token, last_id = decode_cursor(cursor, collection_name, filters) if cursor else (None, None)
+
+    try:
+        collection = await _get_collection(collection_name)
+        snapshot = _id_snapshots.get(token) if token else None
+        if snapshot is None:
+            token, snapshot = await _snapshot_ids(collection, where, where_document)
+        batch_ids, more = await _executor.run(snapshot.ids_after, last_id, page_size)
+        page = await _get_in_id_order(
+            collection, batch_ids, include, where=where, where_document=where_document
+        )
+    except Exception as e:
+        raise Exception(f"Failed to iterate documents in collection '{collection_name}': {str(e)}") from e
+
+    page["next_cursor"] = encode_cursor(collection_name, token, filters, batch_ids[-1]) if more else None
+    return page
+
+@mcp.tool()
+async def chroma_export_collection(
+    collection_name: str,
+    file_name: str,
+    ctx: Context,
+    format: str = "jsonl",
+    include_embeddings: bool = False,
+    where: Dict | None = None
+) -> Dict:
+    """Export a whole collection to files on the server in one streaming pass.
+    
+    The IDs matching `where` are first spilled, in bounded pages, to a sorted snapshot file;
+    the documents are then fetched by ID in sorted pages and written as they arrive, so memory
+    use does not grow with the collection, every document is exported at most once even if
+    writes land during the export, and no page costs more than the first. Files are written
+    under the server's export directory (CHROMA_MCP_EXPORT_DIR).
+    
+    Args:
+        collection_name: Name of the collection to export
+        file_name: Output file name, relative to the export directory
+        format: 'jsonl' for one JSON record (id, document, metadata) per line, or 'npy' for
+                embeddings in <file_name>.npy plus the records in <file_name>.jsonl, row-aligned
+        include_embeddings: Add each record's embedding to the JSONL output (always included for 'npy')
+        where: Optional metadata filters using Chroma's query operators
+    
+    Returns:
+        The files written and the number of records exported
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}'. Options: {list(EXPORT_FORMATS)}")
+    path = resolve_export_path(_export_dir, file_name)
+
+    try:
+        collection = await _get_collection(collection_name)
+        token, snapshot = await _snapshot_ids(collection, where, None)
+    except Exception as e:
+        raise Exception(f"Failed to start export of collection '{collection_name}': {str(e)}") from e
+
+    try:
+        writer = await _executor.run(CollectionExportWriter, path, format, include_embeddings)
+        include = ["documents", "metadatas"] + (["embeddings"] if writer.include_embeddings else [])
+        try:
+            last_id, scanned, more = None, 0, True
+            while more:
+                batch_ids, more = await _executor.run(snapshot.ids_after, last_id, _EXPORT_PAGE_SIZE)
+                if not batch_ids:
+                    break
+                page = await _get_in_id_order(collection, batch_ids, include)
+                await _executor.run(writer.write_page, page)
+                last_id, scanned = batch_ids[-1], scanned + len(batch_ids)
+                await _report_progress(ctx, scanned, snapshot.count, f"Exported {writer.rows} documents")
+            files = await _executor.run(writer.close)
+        except Exception:
+            await _executor.run(writer.abort)
+            raise
+    except Exception as e:
+        raise Exception(f"Failed to export collection '{collection_name}': {str(e)}") from e
+    finally:
+        _id_snapshots.drop(token)
+
+    return {
+        "collection_name": collection_name,
+        "format": format,
+        "files": files,
+        "documents": writer.rows,
+    }
+
 @mcp.tool()
 async def chroma_update_documents(
     collection_name: str,
@@ -581,9 +1212,8 @@ async def chroma_update_documents(
         raise ValueError("Length of 'documents' list must match length of 'ids' list.")
 
 
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
+        collection = await _get_collection(collection_name)
     except Exception as e:
         raise Exception(
             f"Failed to get collection '{collection_name}': {str(e)}"
@@ -599,7 +1229,13 @@ async def chroma_update_documents(
     kwargs = {k: v for k, v in update_args.items() if v is not None}
 
     try:
-        collection.update(**kwargs)
+        await _write([collection_name], collection.update, **kwargs)
+        if documents is not None:
+            # Chroma skips unknown IDs; indexing them would leave phantom BM25 documents
+            existing = set((await _executor.run(collection.get, ids=ids, include=[]))["ids"])
+            updated = [(doc_id, document) for doc_id, document in zip(ids, documents) if doc_id in existing]
+            if updated:
+                _lexical_indexes.upsert(collection_name, *map(list, zip(*updated)))
         return (
             f"Successfully processed update request for {len(ids)} documents in "
             f"collection '{collection_name}'. Note: Non-existent IDs are ignored by ChromaDB."
@@ -630,16 +1266,16 @@ async def chroma_delete_documents(
     if not ids:
         raise ValueError("The 'ids' list cannot be empty.")
 
-    client = get_chroma_client()
     try:
-        collection = client.get_collection(collection_name)
+        collection = await _get_collection(collection_name)
     except Exception as e:
         raise Exception(
             f"Failed to get collection '{collection_name}': {str(e)}"
         ) from e
 
     try:
-        collection.delete(ids=ids)
+        await _write([collection_name], collection.delete, ids=ids)
+        _lexical_indexes.delete(collection_name, ids)
         return (
             f"Successfully deleted {len(ids)} documents from "
             f"collection '{collection_name}'. Note: Non-existent IDs are ignored by ChromaDB."
@@ -649,6 +1285,202 @@ async def chroma_delete_documents(
             f"Failed to delete documents from collection '{collection_name}': {str(e)}"
         ) from e
 
+async def _load_documents(collection) -> tuple:
+    """Read every id and document of a collection, a page at a time."""
+    ids, documents = [], []
+    while True:
+        page = await _executor.run(
+            collection.get, include=["documents"], limit=_LEXICAL_INDEX_PAGE_SIZE, offset=len(ids)
+        )
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        if len(page["ids"]) < _LEXICAL_INDEX_PAGE_SIZE:
+            return ids, documents
+
+@mcp.tool()
+async def chroma_hybrid_query(
+    collection_name: str,
+    query_texts: List[str],
+    n_results: int = 5,
+    vector_weight: float = 0.5,
+    where: Dict | None = None,
+    where_document: Dict | None = None,
+    include: List[str] = ["documents", "metadatas", "distances"],
+    rebuild_index: bool = False
+) -> Dict:
+    """Query a Chroma collection with both keyword (BM25) and semantic search, fusing the rankings.
+    
+    Keyword search finds exact terms such as product codes and error strings that semantic
+    search can miss. Each ranking contributes weight / (60 + rank) per hit (reciprocal rank fusion).
+    
+    Args:
+        collection_name: Name of the collection to query
+        query_texts: List of query texts to search for
+        n_results: Number of fused results to return per query
+        vector_weight: Weight of the semantic ranking between 0 and 1; the keyword ranking gets 1 - vector_weight
+        where: Optional metadata filters using Chroma's query operators, applied to both rankings
+        where_document: Optional document content filters, applied to both rankings
+        include: List of what to include in response. By default, this will include documents, metadatas, and distances.
+        rebuild_index: Rebuild the collection's keyword index from its documents first, e.g. after
+                       writes made by other clients
+    
+    Returns:
+        The fused results with a fusion `scores` list and the BM25 `lexical_scores` of each hit.
+        `distances` is null for hits found only by keyword search.
+    """
+    if not query_texts:
+        raise ValueError("The 'query_texts' list cannot be empty.")
+    if not 0 <= vector_weight <= 1:
+        raise ValueError("vector_weight must be between 0 and 1.")
+
+    candidates = n_results * _HYBRID_CANDIDATE_FACTOR
+    try:
+        collection = await _get_collection(collection_name)
+        vector_results, index = await asyncio.gather(
+            _query_collection(collection_name, query_texts, candidates, where, where_document, ["distances"]),
+            _lexical_indexes.get(
+                collection_name, lambda: _load_documents(collection), _executor.run, rebuild=rebuild_index
+            )
+        )
+        lexical_hits = [dict(index.search(text, candidates)) for text in query_texts]
+        if where or where_document:
+            # The keyword index knows nothing about metadata, so filter its hits through Chroma
+            hit_ids = list(set().union(*lexical_hits))
+            allowed = set()
+            if hit_ids:
+                allowed = set((await _executor.run(
+                    collection.get, ids=hit_ids, where=where, where_document=where_document, include=[]
+                ))["ids"])
+            lexical_hits = [{doc_id: score for doc_id, score in hits.items() if doc_id in allowed} for hits in lexical_hits]
+
+        fused = [
+            reciprocal_rank_fusion([vector_ids, list(hits)], [vector_weight, 1 - vector_weight], n_results)
+            for vector_ids, hits in zip(vector_results["ids"], lexical_hits)
+        ]
+        fields = [field for field in include if field in ("documents", "metadatas", "embeddings", "uris")]
+        payload = {}
+        fused_ids = list({doc_id for ranking in fused for doc_id, _ in ranking})
+        if fields and fused_ids:
+            records = await _executor.run(collection.get, ids=fused_ids, include=fields)
+            payload = {field: dict(zip(records["ids"], records[field])) for field in fields}
+    except Exception as e:
+        raise Exception(f"Failed to run hybrid query on collection '{collection_name}': {str(e)}") from e
+
+    result = {"ids": [], "scores": [], "lexical_scores": []}
+    result.update({field: [] for field in fields})
+    if "distances" in include:
+        result["distances"] = []
+    for ranking, vector_ids, vector_distances, hits in zip(
+        fused, vector_results["ids"], vector_results["distances"], lexical_hits
+    ):
+        distances = dict(zip(vector_ids, vector_distances))
+        result["ids"].append([doc_id for doc_id, _ in ranking])
+        result["scores"].append([score for _, score in ranking])
+        result["lexical_scores"].append([hits.get(doc_id) for doc_id, _ in ranking])
+        for field in fields:
+            result[field].append([payload[field].get(doc_id) for doc_id, _ in ranking])
+        if "distances" in include:
+            result["distances"].append([distances.get(doc_id) for doc_id, _ in ranking])
+    return result
+
+##### Server Tools #####
+
+@mcp.tool()
+async def chroma_embed(
+    texts: List[str],
+    embedding_function_name: str = "default",
+    collection_name: str | None = None
+) -> Dict:
+    """Embed texts with one of the server's embedding functions.
+    
+    Concurrent requests for the same embedding function are batched together.
+    
+    Args:
+        texts: List of texts to embed
+        embedding_function_name: Name of the embedding function to use. Options: 'default', 'cohere', 'openai', 'jina', 'voyageai', 'roboflow'
+        collection_name: Optional collection whose embedding function to use instead, so the
+                         vectors can be passed to chroma_query_by_embedding for that collection
+    
+    Returns:
+        The vectors as base64 of packed little-endian float32 values, in input order,
+        with their count and dimension
+    """
+    if not texts:
+        raise ValueError("The 'texts' list cannot be empty.")
+
+    if collection_name is not None:
+        try:
+            collection = await _get_collection(collection_name)
+            embedding_function = await _embedding_function(collection)
+        except Exception as e:
+            raise Exception(f"Failed to get collection '{collection_name}': {str(e)}") from e
+        if embedding_function is None:
+            raise ValueError(f"Collection '{collection_name}' has no embedding function.")
+        try:
+            embedding_function_name = embedding_function.name()
+        except Exception:
+            embedding_function_name = type(embedding_function).__name__
+    else:
+        embedding_function = await _embedders.get(embedding_function_name)
+
+    try:
+        vectors = await _embedders.embed(embedding_function, texts)
+    except Exception as e:
+        raise Exception(f"Failed to embed texts: {str(e)}") from e
+    return {
+        "embedding_function": embedding_function_name,
+        "count": len(vectors),
+        "dimension": len(vectors[0]),
+        "dtype": "float32",
+        "byteorder": "little",
+        "embeddings": encode_embeddings(vectors),
+    }
+
+@mcp.tool()
+async def chroma_cache_stats() -> Dict:
+    """Get hit rates and memory use of the server's query caches, and how many queries were coalesced.
+    
+    Returns:
+        Statistics for the query result, query embedding and collection handle caches,
+        query coalescing, the lexical indexes used by chroma_hybrid_query, embedding batches
+        and the ID snapshots held for chroma_iter_documents
+    """
+    return {
+        "query_result_cache": _query_result_cache.stats(),
+        "query_embedding_cache": _query_embedding_cache.stats(),
+        "query_coalescing": _query_flights.stats(),
+        "collection_cache": _collection_cache.stats(),
+        "lexical_indexes": _lexical_indexes.stats(),
+        "embedders": _embedders.stats(),
+        "id_snapshots": _id_snapshots.stats(),
+    }
+
+@mcp.tool()
+async def chroma_collection_versions(collection_names: List[str]) -> Dict:
+    """Get a version token for each collection that changes when the collection is written.
+    
+    Clients caching answers derived from a collection compare tokens between requests to know
+    when to drop them. Writes through this server change the token immediately; writes made
+    straight to Chroma (e.g. by a bulk loader) change it when they change the document count.
+    Tokens also change when the server restarts.
+    
+    Args:
+        collection_names: Names of the collections
+    
+    Returns:
+        A mapping of collection name to its version token
+    """
+    versions = {}
+    for name in collection_names:
+        generation = _query_result_cache.generation(name)
+        try:
+            collection = await _get_collection(name)
+            count = await _executor.run(collection.count)
+        except Exception as e:
+            raise Exception(f"Failed to get version of collection '{name}': {str(e)}") from e
+        versions[name] = f"{_server_epoch}:{generation}:{count}"
+    return versions
+
 def validate_thought_data(input_data: Dict) -> Dict:
     """Validate thought data structure."""
     if not input_data.get("sessionId"):
@@ -701,6 +1533,7 @@ def process_thought(input_data: Dict) -> Dict:
 
 def main():
     """Entry point for the Chroma MCP server."""
+    global _export_dir
     parser = create_parser()
     args = parser.parse_args()
     
@@ -727,6 +1560,19 @@ def main():
         if not args.api_key:
             parser.error("API key must be provided via --api-key flag or CHROMA_API_KEY environment variable when using cloud client")
     
+    _executor.configure(
+        max_workers=args.executor_workers,
+        default_limit=args.tool_concurrency,
+        limits=parse_tool_limits(args.tool_concurrency_limits)
+    )
+    _query_embedding_cache.configure(int(args.query_embedding_cache_mb * 1024 * 1024))
+    _query_result_cache.configure(args.query_result_cache_size, args.query_result_cache_ttl)
+    _collection_cache.configure(args.collection_cache_ttl)
+    _embedding_worker.configure(args.embed_workers, default_limit=1)
+    _embedders.configure(args.embed_batch_size, args.embed_batch_wait_ms)
+    _export_dir = args.export_dir
+    _id_snapshots.configure(os.path.join(_export_dir, '.id-snapshots'), args.iter_max_ids)
+    
     # Initialize client with parsed args
     try:
         get_chroma_client(args)
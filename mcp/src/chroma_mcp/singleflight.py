@@ -0,0 +1,52 @@
+"""Coalesce identical concurrent calls into one shared in-flight call."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Concurrent `do()` calls with the same key share one execution of `fn` and
+    all receive its result or exception. The call runs as its own task, so a
+    caller that is cancelled does not cancel it for the others; the key is
+    released as soon as the call finishes, so later calls start fresh.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark the exception retrieved in case every caller was cancelled
+            future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.calls + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
+
+    def gauges(self) -> Dict[str, float]:
+        stats = self.stats()
+        return {
+            "query_in_flight_calls": stats["in_flight"],
+            "query_coalesced_calls": stats["coalesced"],
+        }
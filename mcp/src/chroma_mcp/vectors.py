@@ -0,0 +1,56 @@
+"""Decoding and validation of caller-supplied embedding vectors."""
+
+import base64
+import binascii
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+def encode_embeddings(vectors: List[np.ndarray]) -> str:
+    """Pack vectors back to back as little-endian float32 and base64-encode them."""
+    return base64.b64encode(np.asarray(vectors, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_embeddings(
+    value: Union[List[List[float]], str], dimension: Optional[int]
+) -> np.ndarray:
+    """
+    Turn a list of float lists, or a base64 string of packed little-endian
+    float32 values, into a 2-D float32 array. A packed buffer is split into
+    vectors of `dimension` values; when the dimension is unknown (an empty
+    collection) it is read as a single vector. Raises ValueError for malformed
+    input, non-finite values or a dimension mismatch.
+    """
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except binascii.Error as e:
+            raise ValueError(f"query_embeddings is not valid base64: {e}") from e
+        if not raw or len(raw) % 4:
+            raise ValueError(f"Packed query_embeddings must be a non-empty multiple of 4 bytes, got {len(raw)}.")
+        flat = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+        width = dimension or len(flat)
+        if len(flat) % width:
+            raise ValueError(
+                f"Packed query_embeddings hold {len(flat)} floats, not a multiple of the "
+                f"collection's dimension {width}."
+            )
+        vectors = flat.reshape(-1, width)
+    else:
+        if not value:
+            raise ValueError("The 'query_embeddings' list cannot be empty.")
+        lengths = {len(vector) for vector in value}
+        if len(lengths) != 1:
+            raise ValueError(f"All query_embeddings must have the same length, got lengths {sorted(lengths)}.")
+        vectors = np.asarray(value, dtype=np.float32)
+
+    if vectors.shape[1] == 0:
+        raise ValueError("query_embeddings must not be empty vectors.")
+    if dimension is not None and vectors.shape[1] != dimension:
+        raise ValueError(
+            f"query_embeddings have dimension {vectors.shape[1]}, but the collection's is {dimension}."
+        )
+    if not np.isfinite(vectors).all():
+        raise ValueError("query_embeddings must not contain NaN or infinite values.")
+    return vectors
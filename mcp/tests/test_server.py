@@ -1,4 +1,5 @@
 import pytest
+import asyncio
 from chroma_mcp.server import get_chroma_client, create_parser, mcp
 import chromadb
 import sys
@@ -919,4 +920,646 @@ async def test_get_documents_collection_not_found():
         await mcp.call_tool("chroma_get_documents", {
             "collection_name": "non_existent_collection",
             "ids": ["doc1"]
-        })
\ No newline at end of file
+        })
+@pytest.mark.asyncio
+async def test_prometheus_metrics_endpoint():
+    """Test that tool calls and failures show up in the Prometheus endpoint."""
+    from starlette.testclient import TestClient
+
+    await mcp.call_tool("chroma_list_collections", {})
+    with pytest.raises(ToolError):
+        await mcp.call_tool("chroma_get_collection_count", {"collection_name": "non_existent_collection"})
+
+    with TestClient(mcp.sse_app()) as client:
+        response = client.get("/metrics/prometheus")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE chroma_mcp_tool_call_seconds histogram" in body
+    assert 'chroma_mcp_tool_call_seconds_bucket{tool="chroma_list_collections",le="+Inf"}' in body
+    assert 'chroma_mcp_tool_errors_total{tool="chroma_get_collection_count"}' in body
+    assert 'chroma_mcp_request_seconds_count{method="tools/call"}' in body
+    assert "chroma_mcp_event_loop_lag_last_seconds" in body
+
+@pytest.mark.asyncio
+async def test_tool_executor_overlaps_blocking_calls_within_limits():
+    """Test that blocking calls run concurrently off the loop and per-tool limits serialize them."""
+    import time as time_module
+    from chroma_mcp.concurrency import ToolExecutor, parse_tool_limits
+
+    executor = ToolExecutor(max_workers=4, default_limit=4, limits=parse_tool_limits("slow_tool=1"))
+
+    async def call(tool_name):
+        async with executor.slot(tool_name):
+            await executor.run(time_module.sleep, 0.2)
+
+    try:
+        start = time_module.perf_counter()
+        await asyncio.gather(*(call("fast_tool") for _ in range(4)))
+        assert time_module.perf_counter() - start < 0.35
+
+        start = time_module.perf_counter()
+        await asyncio.gather(*(call("slow_tool") for _ in range(2)))
+        assert time_module.perf_counter() - start >= 0.4
+    finally:
+        executor.shutdown()
+
+    with pytest.raises(ValueError, match="Invalid tool concurrency limit"):
+        parse_tool_limits("chroma_add_documents=0")
+
+@pytest.mark.asyncio
+async def test_add_documents_rejects_only_existing_ids():
+    """Test that the duplicate check reports exactly the batch IDs already in the collection."""
+    collection_name = "test_duplicate_ids"
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["first", "second"],
+            "ids": ["id1", "id2"]
+        })
+        with pytest.raises(ToolError, match=r"already exist in collection 'test_duplicate_ids': \['id2'\]"):
+            await mcp.call_tool("chroma_add_documents", {
+                "collection_name": collection_name,
+                "documents": ["second again", "third"],
+                "ids": ["id2", "id3"]
+            })
+
+        # Nothing from the rejected batch was written
+        count_result = await mcp.call_tool("chroma_get_collection_count", {"collection_name": collection_name})
+        assert count_result[0].text == "2"
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_bulk_add_documents_batches_and_reports_failures():
+    """Test bulk add splits into batches and keeps going past a failed batch."""
+    collection_name = "test_bulk_add"
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["already here"],
+            "ids": ["doc3"]
+        })
+        result = await mcp.call_tool("chroma_bulk_add_documents", {
+            "collection_name": collection_name,
+            "documents": [f"document {i}" for i in range(7)],
+            "ids": [f"doc{i}" for i in range(7)],
+            "metadatas": [{"index": i} for i in range(7)],
+            "batch_size": 3
+        })
+        summary = json.loads(result[0].text)
+        assert summary["batch_size"] == 3
+        assert [b["status"] for b in summary["batches"]] == ["succeeded", "failed", "succeeded"]
+        assert "doc3" in summary["batches"][1]["error"]
+        assert summary["added"] == 4 and summary["failed"] == 3
+
+        count_result = await mcp.call_tool("chroma_get_collection_count", {"collection_name": collection_name})
+        assert count_result[0].text == "5"
+
+        with pytest.raises(ToolError, match="IDs must be unique"):
+            await mcp.call_tool("chroma_bulk_add_documents", {
+                "collection_name": collection_name,
+                "documents": ["a", "b"],
+                "ids": ["dup", "dup"]
+            })
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_query_embedding_cache_reuses_vectors():
+    """Test that repeated query texts are served from the query-embedding cache."""
+    from chroma_mcp import server
+    from chroma_mcp.embedding_cache import QueryEmbeddingCache
+
+    collection_name = "test_query_embedding_cache"
+    cache = server._query_embedding_cache
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["apples are red", "bananas are yellow"],
+            "ids": ["a", "b"]
+        })
+        hits, misses = cache.hits, cache.misses
+        first = json.loads((await mcp.call_tool("chroma_query_documents", {
+            "collection_name": collection_name, "query_texts": ["red fruit", "red fruit"], "n_results": 1
+        }))[0].text)
+        assert (cache.hits - hits, cache.misses - misses) == (0, 1)
+
+        second = json.loads((await mcp.call_tool("chroma_query_documents", {
+            "collection_name": collection_name, "query_texts": ["red fruit"], "n_results": 1
+        }))[0].text)
+        assert cache.hits - hits == 1
+        assert second["ids"][0] == first["ids"][0]
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+    # The memory budget evicts least recently used vectors
+    small = QueryEmbeddingCache(max_bytes=2 * (4 * 4 + 200))
+    small.put("ef", "one", [0.0] * 4)
+    small.put("ef", "two", [0.0] * 4)
+    small.get("ef", "one")
+    small.put("ef", "three", [0.0] * 4)
+    assert small.get("ef", "two") is None
+    assert small.get("ef", "one") is not None and small.get("ef", "three") is not None
+
+@pytest.mark.asyncio
+async def test_query_result_cache_invalidated_by_writes():
+    """Test that repeated queries are served from the result cache until the collection is written."""
+    from chroma_mcp import server
+
+    collection_name = "test_query_result_cache"
+    cache = server._query_result_cache
+    query = {"collection_name": collection_name, "query_texts": ["red fruit"], "n_results": 5}
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["apples are red"],
+            "ids": ["a"]
+        })
+        hits = cache.hits
+        first = json.loads((await mcp.call_tool("chroma_query_documents", query))[0].text)
+        second = json.loads((await mcp.call_tool("chroma_query_documents", query))[0].text)
+        assert cache.hits - hits == 1
+        assert second == first
+
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["cherries are red"],
+            "ids": ["c"]
+        })
+        third = json.loads((await mcp.call_tool("chroma_query_documents", query))[0].text)
+        assert cache.hits - hits == 1
+        assert sorted(third["ids"][0]) == ["a", "c"]
+
+        stats = json.loads((await mcp.call_tool("chroma_cache_stats", {}))[0].text)
+        assert stats["query_result_cache"]["invalidations"] >= 1
+        assert "hit_ratio" in stats["query_embedding_cache"]
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+    # A result computed before a write is not stored
+    generation = cache.generation(collection_name)
+    cache.invalidate(collection_name)
+    cache.put(collection_name, "stale", {"ids": [["a"]]}, generation)
+    assert cache.get(collection_name, "stale") is None
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_queries_are_coalesced():
+    """Test that identical in-flight queries share one Chroma call and its result or error."""
+    from chroma_mcp import server
+    from chroma_mcp.singleflight import SingleFlight
+
+    collection_name = "test_query_coalescing"
+    flights = server._query_flights
+    query = {"collection_name": collection_name, "query_texts": ["red fruit"], "n_results": 1}
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["apples are red"],
+            "ids": ["a"]
+        })
+        calls, coalesced = flights.calls, flights.coalesced
+        results = await asyncio.gather(*[mcp.call_tool("chroma_query_documents", query) for _ in range(3)])
+        assert (flights.calls - calls, flights.coalesced - coalesced) == (1, 2)
+        assert len({result[0].text for result in results}) == 1
+        assert flights.stats()["in_flight"] == 0
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+    started = 0
+    release = asyncio.Event()
+
+    async def failing_call():
+        nonlocal started
+        started += 1
+        await release.wait()
+        raise RuntimeError("backend unavailable")
+
+    single = SingleFlight()
+    waiters = [asyncio.ensure_future(single.do("key", failing_call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+    assert started == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+@pytest.mark.asyncio
+async def test_collection_handles_cached_until_delete_or_rename():
+    """Test that collection handles are reused and dropped on delete and rename."""
+    from chroma_mcp import server
+
+    cache = server._collection_cache
+    await mcp.call_tool("chroma_create_collection", {"collection_name": "test_handle_cache"})
+    try:
+        misses = cache.misses
+        await mcp.call_tool("chroma_get_collection_count", {"collection_name": "test_handle_cache"})
+        await mcp.call_tool("chroma_get_collection_count", {"collection_name": "test_handle_cache"})
+        assert cache.misses - misses == 1
+
+        await mcp.call_tool("chroma_modify_collection", {
+            "collection_name": "test_handle_cache", "new_name": "test_handle_cache_renamed"
+        })
+        with pytest.raises(ToolError):
+            await mcp.call_tool("chroma_get_collection_count", {"collection_name": "test_handle_cache"})
+        count = await mcp.call_tool("chroma_get_collection_count", {"collection_name": "test_handle_cache_renamed"})
+        assert json.loads(count[0].text) == 0
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": "test_handle_cache_renamed"})
+    assert "test_handle_cache_renamed" not in cache._entries
+    with pytest.raises(ToolError):
+        await mcp.call_tool("chroma_get_collection_count", {"collection_name": "test_handle_cache_renamed"})
+
+@pytest.mark.asyncio
+async def test_query_many_merges_collections_by_distance():
+    """Test that chroma_query_many fans out over a glob and merges hits by distance."""
+    from chroma_mcp.ranking import merge_by_distance
+
+    shards = {
+        "test_query_many_2023": (["apples are red", "the sky is blue"], ["a23", "s23"]),
+        "test_query_many_2024": (["cherries are red", "grass is green"], ["c24", "g24"]),
+    }
+    try:
+        for name, (documents, ids) in shards.items():
+            await mcp.call_tool("chroma_add_documents", {"collection_name": name, "documents": documents, "ids": ids})
+
+        result = json.loads((await mcp.call_tool("chroma_query_many", {
+            "collection_names": ["test_query_many_*", "missing_collection"],
+            "query_texts": ["red fruit"],
+            "n_results": 3
+        }))[0].text)
+        assert len(result["ids"][0]) == 3
+        assert result["distances"][0] == sorted(result["distances"][0])
+        assert {hit_id: source for hit_id, source in zip(result["ids"][0], result["collections"][0])}.items() >= {
+            "a23": "test_query_many_2023", "c24": "test_query_many_2024"
+        }.items()
+        assert set(result["errors"]) == {"missing_collection"}
+    finally:
+        for name in shards:
+            await mcp.call_tool("chroma_delete_collection", {"collection_name": name})
+
+    merged = merge_by_distance({
+        "one": {"ids": [["x", "y"]], "distances": [[0.1, 0.5]], "documents": [["dx", "dy"]]},
+        "two": {"ids": [["z"]], "distances": [[0.3]], "documents": [["dz"]]},
+    }, n_results=2)
+    assert merged["ids"] == [["x", "z"]]
+    assert merged["collections"] == [["one", "two"]]
+    assert merged["documents"] == [["dx", "dz"]]
+
+@pytest.mark.asyncio
+async def test_hybrid_query_fuses_keyword_and_vector_rankings():
+    """Test that chroma_hybrid_query finds exact terms and keeps its keyword index current on writes."""
+    from chroma_mcp import server
+    from chroma_mcp.lexical_index import BM25Index, tokenize
+    from chroma_mcp.ranking import reciprocal_rank_fusion
+
+    collection_name = "test_hybrid_query"
+    indexes = server._lexical_indexes
+    query = {"collection_name": collection_name, "query_texts": ["error XR-200"], "n_results": 2, "vector_weight": 0.0}
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["pump reports error XR-200 on startup", "pump runs quietly", "valve error codes"],
+            "ids": ["xr", "quiet", "valve"],
+            "metadatas": [{"kind": "pump"}, {"kind": "pump"}, {"kind": "valve"}]
+        })
+        builds = indexes.builds
+        result = json.loads((await mcp.call_tool("chroma_hybrid_query", query))[0].text)
+        assert result["ids"][0][0] == "xr"
+        assert result["documents"][0][0] == "pump reports error XR-200 on startup"
+        assert result["lexical_scores"][0][0] > 0
+
+        filtered = json.loads((await mcp.call_tool("chroma_hybrid_query", {**query, "where": {"kind": "valve"}}))[0].text)
+        assert filtered["ids"][0] == ["valve"]
+
+        # Writes through the server update the index instead of forcing a rebuild
+        await mcp.call_tool("chroma_delete_documents", {"collection_name": collection_name, "ids": ["xr"]})
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name, "documents": ["XR-200 seal replaced"], "ids": ["seal"]
+        })
+        result = json.loads((await mcp.call_tool("chroma_hybrid_query", query))[0].text)
+        assert result["ids"][0][0] == "seal" and "xr" not in result["ids"][0]
+        assert indexes.builds - builds == 1
+
+        # Updating an unknown ID must not add it to the index
+        await mcp.call_tool("chroma_update_documents", {
+            "collection_name": collection_name, "ids": ["seal", "ghost"],
+            "documents": ["XR-200 seal inspected", "XR-200 phantom"]
+        })
+        result = json.loads((await mcp.call_tool("chroma_hybrid_query", query))[0].text)
+        assert result["ids"][0][0] == "seal" and "ghost" not in result["ids"][0]
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+    assert tokenize("Error XR-200") == ["error", "xr-200", "xr", "200"]
+    index = BM25Index.from_documents(["a", "b"], ["red apple", "green apple pie"])
+    index.upsert(["a"], ["blue sky"])
+    assert [doc_id for doc_id, _ in index.search("apple", 5)] == ["b"]
+    assert reciprocal_rank_fusion([["x", "y"], ["y", "z"]], [0.5, 0.5], 2)[0][0] == "y"
+
+@pytest.mark.asyncio
+async def test_query_mmr_diversifies_near_duplicates():
+    """Test that chroma_query_mmr skips near-duplicate chunks unless lambda_mult favors relevance only."""
+    collection_name = "test_query_mmr"
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["red apples are sweet", "sweet red apples are", "red cherries taste tart"],
+            "ids": ["apple_1", "apple_2", "cherry"]
+        })
+        query = {"collection_name": collection_name, "query_texts": ["sweet red apples"], "n_results": 2, "fetch_k": 3}
+
+        relevant = json.loads((await mcp.call_tool("chroma_query_mmr", {**query, "lambda_mult": 1.0}))[0].text)
+        assert sorted(relevant["ids"][0]) == ["apple_1", "apple_2"]
+
+        diverse = json.loads((await mcp.call_tool("chroma_query_mmr", {**query, "lambda_mult": 0.3}))[0].text)
+        assert diverse["ids"][0][1] == "cherry"
+        assert len(diverse["documents"][0]) == len(diverse["distances"][0]) == 2
+        assert "embeddings" not in diverse
+
+        with pytest.raises(ToolError):
+            await mcp.call_tool("chroma_query_mmr", {**query, "fetch_k": 1})
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_query_by_embedding_accepts_lists_and_packed_float32():
+    """Test that chroma_query_by_embedding queries with caller vectors and checks their dimension."""
+    import base64
+    import numpy as np
+
+    collection_name = "test_query_by_embedding"
+    client = get_chroma_client()
+    collection = client.get_or_create_collection(collection_name)
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["apples are red", "the sky is blue"],
+            "ids": ["apple", "sky"]
+        })
+        vector = collection.get(ids=["sky"], include=["embeddings"])["embeddings"][0]
+
+        listed = json.loads((await mcp.call_tool("chroma_query_by_embedding", {
+            "collection_name": collection_name, "query_embeddings": [list(map(float, vector))], "n_results": 1
+        }))[0].text)
+        assert listed["ids"] == [["sky"]]
+
+        packed = base64.b64encode(np.asarray([vector, vector], dtype="<f4").tobytes()).decode()
+        result = json.loads((await mcp.call_tool("chroma_query_by_embedding", {
+            "collection_name": collection_name, "query_embeddings": packed, "n_results": 1
+        }))[0].text)
+        assert result["ids"] == [["sky"], ["sky"]]
+
+        with pytest.raises(ToolError, match="dimension"):
+            await mcp.call_tool("chroma_query_by_embedding", {
+                "collection_name": collection_name, "query_embeddings": [[0.1, 0.2, 0.3]]
+            })
+        with pytest.raises(ToolError, match="base64"):
+            await mcp.call_tool("chroma_query_by_embedding", {
+                "collection_name": collection_name, "query_embeddings": "not base64!"
+            })
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_embed_batches_concurrent_requests():
+    """Test that chroma_embed shares one embedding function and batches concurrent requests."""
+    import base64
+    import numpy as np
+    from chroma_mcp import server
+    from chroma_mcp.embedders import MicroBatcher
+
+    first = await server._embedders.get("default")
+    assert await server._embedders.get("default") is first
+
+    results = await asyncio.gather(*[
+        mcp.call_tool("chroma_embed", {"texts": [f"text {i}", "shared"]}) for i in range(4)
+    ])
+    payloads = [json.loads(result[0].text) for result in results]
+    assert {(p["count"], p["dtype"], p["byteorder"]) for p in payloads} == {(2, "float32", "little")}
+    vectors = np.frombuffer(base64.b64decode(payloads[0]["embeddings"]), dtype="<f4").reshape(2, -1)
+    assert vectors.shape[1] == payloads[0]["dimension"]
+    np.testing.assert_allclose(vectors[1], first(["shared"])[0], rtol=1e-6)
+
+    calls = []
+
+    async def run(fn, texts):
+        calls.append(list(texts))
+        return fn(texts)
+
+    batcher = MicroBatcher(lambda texts: [[float(len(text))] for text in texts], run, max_batch_size=64, max_wait_ms=20)
+    outputs = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["bb", "ccc"]))
+    assert calls == [["a", "bb", "ccc"]]
+    assert [[float(v[0]) for v in output] for output in outputs] == [[1.0], [2.0, 3.0]]
+
+    with pytest.raises(ToolError):
+        await mcp.call_tool("chroma_embed", {"texts": ["x"], "embedding_function_name": "unknown"})
+
+    builds = []
+    configured = {"embedding_function": {"type": "known", "name": "openai", "config": {"model_name": "m"}}}
+    built = await server._embedders.for_configuration(configured, lambda: builds.append(1) or object())
+    assert await server._embedders.for_configuration(configured, lambda: builds.append(1)) is built
+    assert builds == [1]
+    assert await server._embedders.for_configuration({"embedding_function": {"type": "legacy"}}, object) is None
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_and_ingest_share_embedding_batches():
+    """Test that concurrent query and ingest embeddings are batched and large requests are chunked."""
+    from chroma_mcp import server
+    from chroma_mcp.embedders import MicroBatcher
+
+    collection_name = "test_embedding_batches"
+    registry = server._embedders
+    registry.configure(max_batch_size=64, max_wait_ms=50)
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name, "documents": ["apples are red"], "ids": ["a"]
+        })
+        embedding_function = await server._embedding_function(await server._get_collection(collection_name))
+        # Resolved from the stored configuration to the registry's shared instance
+        assert embedding_function is await registry.get("default")
+        batcher = registry.batcher(embedding_function)
+        requests, batches = batcher.requests, batcher.batches
+        await asyncio.gather(
+            *[mcp.call_tool("chroma_query_documents", {
+                "collection_name": collection_name, "query_texts": [f"fruit number {i}"], "n_results": 1
+            }) for i in range(4)],
+            mcp.call_tool("chroma_add_documents", {
+                "collection_name": collection_name, "documents": ["grapes are green"], "ids": ["g"]
+            })
+        )
+        assert batcher.requests - requests == 5
+        assert batcher.batches - batches < 5
+    finally:
+        registry.configure(max_batch_size=64, max_wait_ms=5)
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+    calls = []
+
+    async def run(fn, texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0.01)
+        return fn(texts)
+
+    batcher = MicroBatcher(lambda texts: [[float(len(text))] for text in texts], run, max_batch_size=2, max_wait_ms=1)
+    bulk = asyncio.ensure_future(batcher.embed(["a", "bb", "ccc", "dddd", "eeeee"]))
+    await asyncio.sleep(0.005)
+    query = await batcher.embed(["q"])
+    assert [float(v[0]) for v in await bulk] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert [float(v[0]) for v in query] == [1.0]
+    # The small request went out between the bulk request's chunks
+    assert calls.index(["q"]) < calls.index(["eeeee"])
+
+@pytest.mark.asyncio
+async def test_iter_documents_pages_in_id_order_with_cursor():
+    """Test that chroma_iter_documents walks a collection by ID and survives writes between pages."""
+    collection_name = "test_iter_documents"
+    ids = [f"doc_{i:02d}" for i in range(7)]
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": [f"document {i}" for i in range(7)],
+            "ids": list(reversed(ids))
+        })
+        first = json.loads((await mcp.call_tool("chroma_iter_documents", {
+            "collection_name": collection_name, "page_size": 3
+        }))[0].text)
+        assert first["ids"] == ids[:3]
+        assert first["documents"] == ["document 6", "document 5", "document 4"]
+
+        # Writes between pages neither shift later pages nor join the running iteration
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name, "documents": ["early", "late"], "ids": ["doc_00a", "doc_05a"]
+        })
+        seen = first["ids"]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = json.loads((await mcp.call_tool("chroma_iter_documents", {
+                "collection_name": collection_name, "page_size": 3, "cursor": cursor
+            }))[0].text)
+            seen += page["ids"]
+            cursor = page["next_cursor"]
+        assert seen == ids
+
+        with pytest.raises(ToolError, match="Cursor belongs"):
+            await mcp.call_tool("chroma_iter_documents", {
+                "collection_name": "other_collection", "cursor": first["next_cursor"]
+            })
+        with pytest.raises(ToolError, match="different 'where'"):
+            await mcp.call_tool("chroma_iter_documents", {
+                "collection_name": collection_name, "cursor": first["next_cursor"], "where": {"n": 1}
+            })
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_id_snapshots_spill_sorted_ids_to_disk(tmp_path):
+    """Test that ID snapshots merge bounded runs into a sorted, de-duplicated spill read by block."""
+    from chroma_mcp.cursors import IdSnapshots
+
+    stored = [f"id_{i:03d}" for i in reversed(range(50))]
+    pages = []
+
+    async def fetch_page(offset, limit):
+        pages.append(limit)
+        # A write landing mid-build shifts offsets and repeats an ID
+        return (stored + ["id_010"])[offset:offset + limit]
+
+    async def run(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    snapshots = IdSnapshots(str(tmp_path), page_size=7, run_size=14, index_every=4)
+    token, spill = await snapshots.create(fetch_page, run)
+    assert set(pages) == {7} and spill.count == 50
+    assert not list(tmp_path.glob("*.run*"))
+
+    seen, last_id, more = [], None, True
+    while more:
+        batch, more = spill.ids_after(last_id, 6)
+        seen += batch
+        last_id = batch[-1]
+    assert seen == sorted(stored)
+    assert spill.ids_after("id_047", 6) == (["id_048", "id_049"], False)
+
+    snapshots.max_ids = 20
+    with pytest.raises(ValueError, match="More than 20"):
+        await snapshots.create(fetch_page, run)
+    snapshots.drop(token)
+    assert not list(tmp_path.iterdir())
+
+@pytest.mark.asyncio
+async def test_export_collection_streams_jsonl_and_npy(tmp_path):
+    """Test that chroma_export_collection writes JSONL and a loadable .npy + .jsonl pair."""
+    import numpy as np
+    from chroma_mcp import server
+
+    collection_name = "test_export_collection"
+    original_export_dir, original_snapshot_dir = server._export_dir, server._id_snapshots.directory
+    server._export_dir = str(tmp_path)
+    server._id_snapshots.directory = tmp_path / ".id-snapshots"
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name,
+            "documents": ["apples are red", "the sky is blue", "grass is green"],
+            "ids": ["a", "b", "c"],
+            "metadatas": [{"n": 1}, {"n": 2}, {"n": 3}]
+        })
+        result = json.loads((await mcp.call_tool("chroma_export_collection", {
+            "collection_name": collection_name, "file_name": "dump.jsonl"
+        }))[0].text)
+        assert result["documents"] == 3
+        records = [json.loads(line) for line in (tmp_path / "dump.jsonl").read_text().splitlines()]
+        assert [record["id"] for record in records] == ["a", "b", "c"]
+        assert [record["metadata"]["n"] for record in records] == [1, 2, 3]
+
+        result = json.loads((await mcp.call_tool("chroma_export_collection", {
+            "collection_name": collection_name, "file_name": "filtered.jsonl", "where": {"n": {"$gte": 2}}
+        }))[0].text)
+        assert result["documents"] == 2
+
+        result = json.loads((await mcp.call_tool("chroma_export_collection", {
+            "collection_name": collection_name, "file_name": "vectors", "format": "npy"
+        }))[0].text)
+        vectors = np.load(tmp_path / "vectors.npy")
+        sidecar = [json.loads(line) for line in (tmp_path / "vectors.jsonl").read_text().splitlines()]
+        assert vectors.shape[0] == len(sidecar) == 3
+        assert vectors.dtype == np.float32
+        assert not list(tmp_path.glob("*.partial"))
+        assert not list((tmp_path / ".id-snapshots").iterdir())
+
+        with pytest.raises(ToolError, match="inside the export directory"):
+            await mcp.call_tool("chroma_export_collection", {
+                "collection_name": collection_name, "file_name": "../escape.jsonl"
+            })
+    finally:
+        server._export_dir, server._id_snapshots.directory = original_export_dir, original_snapshot_dir
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})
+
+@pytest.mark.asyncio
+async def test_collection_versions_change_on_writes():
+    """Test that chroma_collection_versions changes on server writes and on direct Chroma writes."""
+    from chroma_mcp.server import get_chroma_client
+
+    collection_name = "test_collection_versions"
+    try:
+        await mcp.call_tool("chroma_add_documents", {
+            "collection_name": collection_name, "documents": ["one"], "ids": ["1"]
+        })
+        args = {"collection_names": [collection_name]}
+        first = json.loads((await mcp.call_tool("chroma_collection_versions", args))[0].text)[collection_name]
+        assert json.loads((await mcp.call_tool("chroma_collection_versions", args))[0].text)[collection_name] == first
+
+        await mcp.call_tool("chroma_update_documents", {
+            "collection_name": collection_name, "ids": ["1"], "documents": ["uno"]
+        })
+        second = json.loads((await mcp.call_tool("chroma_collection_versions", args))[0].text)[collection_name]
+        assert second != first
+
+        # A write that bypasses the server, like the document loader's
+        get_chroma_client().get_collection(collection_name).add(ids=["2"], documents=["two"])
+        third = json.loads((await mcp.call_tool("chroma_collection_versions", args))[0].text)[collection_name]
+        assert third != second
+
+        with pytest.raises(ToolError, match="Failed to get version"):
+            await mcp.call_tool("chroma_collection_versions", {"collection_names": ["missing_collection"]})
+    finally:
+        await mcp.call_tool("chroma_delete_collection", {"collection_name": collection_name})